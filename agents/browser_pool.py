@@ -0,0 +1,161 @@
+"""
+Browser Pool
+------------
+Keeps one Chromium (persistent, logged-in profile) running across interviews
+instead of starting Playwright and launching the browser for every meeting.
+
+- start():        launches the browser once; later meetings reuse it
+- prepare():      opens the meeting page ahead of the join time, so it is
+                  already loaded when the interview is due
+- acquire():      hands out the prepared page, or opens one now
+- release():      closes the meeting page; the browser stays up
+- health_check(): restarts the browser if it crashed or stopped responding,
+                  recycles it after `max_meetings` meetings (memory growth,
+                  postponed while a page is prepared) and drops prepared
+                  pages that were never used
+
+Uses the sync Playwright API: every call must come from the thread that
+created the pool (the interview agent's schedule loop).
+"""
+
+import time
+from playwright.sync_api import sync_playwright
+
+
+class BrowserPool:
+    LAUNCH_ARGS = [
+        '--use-fake-ui-for-media-stream',
+        '--disable-blink-features=AutomationControlled'
+    ]
+
+    def __init__(self, profile_dir, headless=False, max_meetings=20, prepared_ttl=900):
+        self.profile_dir = profile_dir
+        self.headless = headless
+        self.max_meetings = max_meetings
+        self.prepared_ttl = prepared_ttl
+        self.playwright = None
+        self.context = None
+        self.prepared = {}      # meeting key -> (page, prepared_at)
+        self.in_use = set()
+        self.meetings = 0
+        self.stats = {"launches": 0, "restarts": 0, "recycles": 0, "prepared_hits": 0, "cold_pages": 0}
+
+    def start(self):
+        """Returns the running browser context, launching it if needed."""
+        if self.context is not None:
+            return self.context
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+
+        started = time.time()
+        print(f"[BROWSER] Launching Chromium with profile: {self.profile_dir}")
+        context = self.playwright.chromium.launch_persistent_context(
+            self.profile_dir,
+            headless=self.headless,
+            args=self.LAUNCH_ARGS,
+            permissions=['microphone', 'camera'],
+            accept_downloads=True
+        )
+        context.on("close", self._on_close)  # browser crashed or was closed by hand
+        self.context = context
+        self.meetings = 0
+        self.stats["launches"] += 1
+        print(f"[BROWSER] Ready in {time.time() - started:.1f}s")
+        return context
+
+    def _on_close(self, context):
+        if context is self.context:
+            print("[BROWSER] Browser closed")
+            self.context = None
+            self.prepared.clear()
+            self.in_use.clear()
+
+    def _open(self, url, wait_until="domcontentloaded"):
+        page = self.start().new_page()
+        page.goto(url, wait_until=wait_until)
+        return page
+
+    def prepare(self, key, url, wait_until="domcontentloaded"):
+        """
+        Opens and loads the meeting page for `key` ahead of time (no-op if
+        already prepared). wait_until="commit" returns once navigation starts
+        and lets the page finish loading in the background.
+        """
+        entry = self.prepared.get(key)
+        if entry and not entry[0].is_closed():
+            return
+        try:
+            self.prepared[key] = (self._open(url, wait_until), time.time())
+            print(f"[BROWSER] Pre-loaded meeting page for {key}")
+        except Exception as e:
+            print(f"[WARN] Could not pre-load meeting page for {key}: {e}")
+
+    def acquire(self, key, url):
+        """Returns a loaded page for the meeting: the prepared one if still usable, else a new one."""
+        entry = self.prepared.pop(key, None)
+        if entry and not entry[0].is_closed():
+            page = entry[0]
+            self.stats["prepared_hits"] += 1
+            print("[BROWSER] Using pre-loaded meeting page")
+        else:
+            page = self._open(url)
+            self.stats["cold_pages"] += 1
+        self.in_use.add(page)
+        self.meetings += 1
+        return page
+
+    def release(self, page):
+        """Closes a meeting page; the browser keeps running for the next one."""
+        self.in_use.discard(page)
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    def healthy(self):
+        if self.context is None:
+            return False
+        try:
+            page = self.context.pages[0] if self.context.pages else self.context.new_page()
+            return page.evaluate("1 + 1") == 2
+        except Exception:
+            return False
+
+    def health_check(self):
+        """Keeps the browser warm and working between meetings."""
+        now = time.time()
+        for key, (page, prepared_at) in list(self.prepared.items()):
+            if page.is_closed() or now - prepared_at > self.prepared_ttl:
+                del self.prepared[key]
+                self.release(page)
+
+        if self.in_use:
+            return
+        if self.context is not None and self.meetings >= self.max_meetings and not self.prepared:
+            print(f"[BROWSER] Recycling browser after {self.meetings} meetings")
+            self.stats["recycles"] += 1
+            self._close_context()
+        elif self.context is not None and not self.healthy():
+            print("[BROWSER] Browser not responding, restarting")
+            self.stats["restarts"] += 1
+            self._close_context()
+        try:
+            self.start()
+        except Exception as e:
+            print(f"[ERROR] Browser launch failed: {e}")
+
+    def _close_context(self):
+        context, self.context = self.context, None
+        self.prepared.clear()
+        self.in_use.clear()
+        try:
+            context.close()
+        except Exception:
+            pass
+
+    def close(self):
+        if self.context is not None:
+            self._close_context()
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
@@ -1,22 +1,47 @@
 import requests
 import os
+import time
+import json
+import hashlib
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import google_auth_httplib2
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from google.auth.exceptions import TransportError
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
+from zoneinfo import ZoneInfo
+
+try:
+    from slot_allocator import SlotAllocator, subtract_intervals
+    from rate_limiter import RateLimiter
+except ImportError:
+    from agents.slot_allocator import SlotAllocator, subtract_intervals
+    from agents.rate_limiter import RateLimiter
 
 SCOPES = ['https://www.googleapis.com/auth/calendar']
+RETRYABLE_STATUSES = {403, 429, 500, 502, 503, 504}
+TIMEZONE = 'Asia/Kolkata'
 
 class RequestsHttp:
-    """Adapter to make requests.Session look like httplib2.Http."""
-    def __init__(self, timeout=60):
-        self.session = requests.Session()
-        self.session.trust_env = False 
+    """
+    Adapter to make requests.Session look like httplib2.Http.
+    Each thread gets its own pooled Session, so one adapter can be shared by
+    concurrent workers. 429/5xx responses are retried with backoff.
+    """
+    def __init__(self, timeout=60, pool_size=10, retries=3, backoff=0.5):
         self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
 
     class Response(dict):
         """Response object that mimics httplib2.Response."""
@@ -25,6 +50,26 @@ class RequestsHttp:
             self.status = status
             self.reason = "OK" 
 
+    @property
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.trust_env = False
+            retry = Retry(
+                total=self.retries,
+                backoff_factor=self.backoff,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=None,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._local.session = session
+        return session
+
     def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
         if headers is None:
             headers = {}
@@ -44,17 +89,48 @@ class RequestsHttp:
             print(f"Request failed: {e}")
             raise
 
+
 class CalendarAgent:
     def __init__(self):
         self.root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.data_path = os.path.join(self.root_dir, "data", "scheduled_interviews.xlsx")
         self.creds_path = os.path.join(self.root_dir, "credentials.json")
         self.token_path = os.path.join(self.root_dir, "token.json")
+        self.cache_path = os.path.join(self.root_dir, "data", "calendar_event_cache.json")
+        self.event_cache = {}
         self.creds = None
         self.service = None
+        self.batch_mode = os.getenv("CALENDAR_BATCH_MODE", "true").lower() == "true"
+        self.batch_size = int(os.getenv("CALENDAR_BATCH_SIZE", "50"))
+        self.batch_retries = int(os.getenv("CALENDAR_BATCH_RETRIES", "3"))
+        self.use_allocator = os.getenv("SLOT_ALLOCATOR", "true").lower() == "true"
+        self.duration_minutes = int(os.getenv("INTERVIEW_DURATION_MINUTES", "60"))
+        self.interviewer_capacity = int(os.getenv("INTERVIEWER_CAPACITY", "1"))
+        self.work_start_hour = int(os.getenv("WORK_START_HOUR", "9"))
+        self.work_end_hour = int(os.getenv("WORK_END_HOUR", "18"))
+        self.workers = int(os.getenv("CALENDAR_WORKERS", "1"))
+        self.max_qps = float(os.getenv("CALENDAR_MAX_QPS", "5"))
+        self.pool_size = int(os.getenv("CALENDAR_POOL_SIZE", "10"))
+        self.http_retries = int(os.getenv("CALENDAR_HTTP_RETRIES", "3"))
+        self.api_endpoint = os.getenv("CALENDAR_API_ENDPOINT", "").strip()
+
+    def connect_local_endpoint(self):
+        """Builds the service against CALENDAR_API_ENDPOINT (e.g. fake_calendar_server.py), skipping OAuth."""
+        doc = json.loads(get_static_doc('calendar', 'v3'))
+        root = self.api_endpoint.rstrip('/') + '/'
+        doc['rootUrl'] = root
+        doc['baseUrl'] = root + doc['servicePath']
+
+        http = RequestsHttp(timeout=120, pool_size=max(self.pool_size, self.workers), retries=self.http_retries)
+        self.service = build_from_document(doc, http=http)
+        print(f"Using Calendar API endpoint: {root}")
+        return True
 
     def authenticate(self):
         """Standard OAuth 2.0 flow for Google Calendar."""
+        if self.api_endpoint:
+            return self.connect_local_endpoint()
+
         if os.path.exists(self.token_path):
             self.creds = Credentials.from_authorized_user_file(self.token_path, SCOPES)
         
@@ -74,7 +150,7 @@ class CalendarAgent:
                 token.write(self.creds.to_json())
 
         try:
-            http = RequestsHttp(timeout=120)
+            http = RequestsHttp(timeout=120, pool_size=max(self.pool_size, self.workers), retries=self.http_retries)
             authorized_http = google_auth_httplib2.AuthorizedHttp(self.creds, http=http)
             
             self.service = build('calendar', 'v3', http=authorized_http)
@@ -91,29 +167,74 @@ class CalendarAgent:
             print(f"Error parsing date format: {date_str}. Expected 'DD-MM-YYYY HH:MM AM/PM'")
             return None
 
-    def create_meeting(self, candidate_name, email, role, date_str):
-        """Creates a Google Meet event."""
-        if not self.service:
-            return
+    def candidate_key(self, name, email):
+        """Stable identity of a candidate in the event cache."""
+        return str(email or name).strip().lower()
 
-        start_time = self.parse_datetime(date_str)
-        if not start_time:
-            print(f"Skipping {candidate_name}: Invalid Date {date_str}")
-            return
+    def event_id_for(self, name, email, requested_time):
+        """
+        Deterministic event ID derived from candidate plus the time they asked
+        for (not the slot the allocator gave them, which can change between
+        runs). Google rejects a second insert with the same ID, so re-runs can
+        never double-book.
+        """
+        digest = hashlib.sha1(f"{self.candidate_key(name, email)}|{requested_time.isoformat()}".encode("utf-8")).hexdigest()
+        return f"ahr{digest}"
+
+    def stable_event_id(self, candidate):
+        requested = self.parse_datetime(candidate.get('requested') or candidate['time_str'])
+        return self.event_id_for(candidate['name'], candidate['email'], requested) if requested else None
+
+    def load_event_cache(self):
+        """Loads {candidate_key: {event_id, meet_link, scheduled_time, requested_time}} from disk."""
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not read event cache ({e}); starting fresh.")
+            return {}
+
+    def save_event_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump(self.event_cache, f, indent=2)
+        except OSError as e:
+            print(f"Error saving event cache: {e}")
 
-        end_time = start_time + datetime.timedelta(hours=1)
+    def remember_event(self, name, email, time_str, event, requested_time=None):
+        """
+        Records a created/updated event and returns its Meet link. The requested
+        time is kept too, so a re-run with the same request is recognised even
+        if the allocator moved the interview.
+        """
+        link = self.extract_meet_link(event)
+        self.event_cache[self.candidate_key(name, email)] = {
+            "event_id": event.get('id'),
+            "meet_link": link,
+            "scheduled_time": time_str,
+            "requested_time": requested_time or time_str,
+        }
+        return link
+
+    def build_event(self, candidate_name, email, role, start_time, event_id):
+        """Builds the Calendar API event body for an interview."""
+        end_time = start_time + datetime.timedelta(minutes=self.duration_minutes)
         
-        event = {
+        return {
+            'id': event_id,
             'summary': f'Interview: {candidate_name} - {role}',
             'location': 'Google Meet',
             'description': f'Technical Interview for {role} at Agentic HR.',
             'start': {
                 'dateTime': start_time.isoformat(),
-                'timeZone': 'Asia/Kolkata', 
+                'timeZone': TIMEZONE, 
             },
             'end': {
                 'dateTime': end_time.isoformat(),
-                'timeZone': 'Asia/Kolkata',
+                'timeZone': TIMEZONE,
             },
             'attendees': [
                 {'email': email},
@@ -131,34 +252,343 @@ class CalendarAgent:
             'visibility': 'public',
             'conferenceData': {
                 'createRequest': {
-                    'requestId': f"sample{datetime.datetime.now().timestamp()}",
+                    'requestId': event_id,
                     'conferenceSolutionKey': {'type': 'hangoutsMeet'}
                 }
             },
         }
 
+    def insert_request(self, event):
+        """Returns an (unexecuted) events.insert request for an event body."""
+        return self.service.events().insert(
+            calendarId='primary', 
+            body=event, 
+            conferenceDataVersion=1,
+            sendUpdates='all' # Sends email invite
+        )
+
+    def reschedule_request(self, event_id, start_time):
+        """Returns an (unexecuted) events.patch request moving an event to a new slot."""
+        end_time = start_time + datetime.timedelta(minutes=self.duration_minutes)
+        return self.service.events().patch(
+            calendarId='primary',
+            eventId=event_id,
+            body={
+                'start': {'dateTime': start_time.isoformat(), 'timeZone': TIMEZONE},
+                'end': {'dateTime': end_time.isoformat(), 'timeZone': TIMEZONE},
+            },
+            sendUpdates='all'
+        )
+
+    def meeting_request(self, candidate, start_time):
+        """Insert for new candidates, patch for cached events whose time changed."""
+        if candidate.get('event_id'):
+            return self.reschedule_request(candidate['event_id'], start_time)
+        return self.insert_request(self.build_event(
+            candidate['name'], candidate['email'], candidate['role'], start_time, self.stable_event_id(candidate)
+        ))
+
+    def fetch_existing(self, candidate, start_time):
+        """Recovers an event that already exists under its deterministic ID, moving it to `start_time` if needed."""
+        event_id = self.stable_event_id(candidate)
+        event = self.service.events().get(calendarId='primary', eventId=event_id).execute()
+        if 'dateTime' in event.get('start', {}) and self.to_local(event['start']) != start_time:
+            event = self.reschedule_request(event_id, start_time).execute()
+        return self.remember_event(candidate['name'], candidate['email'], candidate['time_str'], event, candidate.get('requested'))
+
+    def extract_meet_link(self, event):
+        """Returns the Meet link of a created event."""
+        link = event.get('hangoutLink')
+        if not link and event.get('conferenceData'):
+            # Fallback check
+            for entry in event['conferenceData'].get('entryPoints', []):
+                if entry.get('entryPointType') == 'video':
+                    link = entry.get('uri')
+                    break
+        return link
+
+    def create_meeting(self, candidate_name, email, role, date_str, event_id=None, requested=None):
+        """Creates a Google Meet event, or moves the cached event `event_id`."""
+        if not self.service:
+            return
+
+        start_time = self.parse_datetime(date_str)
+        if not start_time:
+            print(f"Skipping {candidate_name}: Invalid Date {date_str}")
+            return
+
+        candidate = {"name": candidate_name, "email": email, "role": role, "time_str": date_str,
+                     "event_id": event_id, "requested": requested}
+
         try:
-            event = self.service.events().insert(
-                calendarId='primary', 
-                body=event, 
-                conferenceDataVersion=1,
-                sendUpdates='all' # Sends email invite
-            ).execute()
-            
-            link = event.get('hangoutLink')
-            if not link and event.get('conferenceData'):
-                # Fallback check
-                for entry in event['conferenceData'].get('entryPoints', []):
-                    if entry.get('entryPointType') == 'video':
-                        link = entry.get('uri')
-                        break
-            
-            print(f"Event created for {candidate_name}: {link}")
+            event = self.meeting_request(candidate, start_time).execute()
+            link = self.remember_event(candidate_name, email, date_str, event, requested)
+            print(f"Event {'updated' if event_id else 'created'} for {candidate_name}: {link}")
             return link
         except HttpError as error:
+            if error.resp.status == 409 and not event_id:
+                try:
+                    link = self.fetch_existing(candidate, start_time)
+                except HttpError as fetch_error:
+                    print(f"An error occurred fetching existing event for {candidate_name}: {fetch_error}")
+                    return None
+                print(f"Event already exists for {candidate_name}: {link}")
+                return link
             print(f"An error occurred creating event for {candidate_name}: {error}")
             return None
 
+    def create_meetings_batch(self, candidates):
+        """
+        Creates events for many candidates through the Calendar batch endpoint.
+        `candidates` is a list of dicts with name, email, role and time_str keys
+        (plus event_id for cached events that only need a time change).
+        Returns a dict mapping list index -> Meet link (None if creation failed).
+        Only items that fail with a retryable status are re-sent.
+        """
+        if not self.service:
+            return {}
+
+        results = {}
+        pending = {}
+        duplicates = []
+        for index, candidate in enumerate(candidates):
+            start_time = self.parse_datetime(candidate['time_str'])
+            if not start_time:
+                print(f"Skipping {candidate['name']}: Invalid Date {candidate['time_str']}")
+                results[index] = None
+                continue
+            pending[str(index)] = start_time
+
+        for attempt in range(self.batch_retries + 1):
+            if not pending:
+                break
+            if attempt:
+                delay = 2 ** attempt
+                print(f"Retrying {len(pending)} failed event(s) in {delay}s (attempt {attempt}/{self.batch_retries})...")
+                time.sleep(delay)
+
+            retry = {}
+
+            def on_response(request_id, response, exception):
+                index = int(request_id)
+                candidate = candidates[index]
+                if exception is None:
+                    results[index] = self.remember_event(
+                        candidate['name'], candidate['email'], candidate['time_str'], response, candidate.get('requested')
+                    )
+                    print(f"Event {'updated' if candidate.get('event_id') else 'created'} for {candidate['name']}: {results[index]}")
+                    return
+                status = getattr(getattr(exception, 'resp', None), 'status', None)
+                if status == 409 and not candidate.get('event_id'):
+                    duplicates.append(index)
+                elif status in RETRYABLE_STATUSES and attempt < self.batch_retries:
+                    retry[request_id] = pending[request_id]
+                else:
+                    print(f"An error occurred creating event for {candidate['name']}: {exception}")
+                    results[index] = None
+
+            keys = list(pending)
+            for start in range(0, len(keys), self.batch_size):
+                batch = self.service.new_batch_http_request(callback=on_response)
+                for key in keys[start:start + self.batch_size]:
+                    batch.add(self.meeting_request(candidates[int(key)], pending[key]), request_id=key)
+                try:
+                    batch.execute()
+                except (HttpError, TransportError, requests.exceptions.RequestException, OSError) as error:
+                    # Timeouts and transport errors too: only the requests that got
+                    # no answer are re-sent, results already received are kept.
+                    print(f"Batch request failed: {error!r}")
+                    for key in keys[start:start + self.batch_size]:
+                        if int(key) not in results and int(key) not in duplicates:
+                            retry.setdefault(key, pending[key])
+
+            pending = retry
+
+        for index in duplicates:
+            candidate = candidates[index]
+            try:
+                results[index] = self.fetch_existing(candidate, self.parse_datetime(candidate['time_str']))
+                print(f"Event already exists for {candidate['name']}: {results[index]}")
+            except HttpError as error:
+                print(f"An error occurred fetching existing event for {candidate['name']}: {error}")
+                results[index] = None
+
+        for key in pending:
+            results.setdefault(int(key), None)
+        return results
+
+    def create_meetings_concurrent(self, candidates):
+        """
+        Creates events for many candidates with a pool of CALENDAR_WORKERS
+        threads, paced to at most CALENDAR_MAX_QPS requests per second.
+        Returns a dict mapping list index -> Meet link (None if creation failed).
+        """
+        if not self.service:
+            return {}
+
+        limiter = RateLimiter(self.max_qps)
+
+        def create(candidate):
+            limiter.acquire()
+            return self.create_meeting(
+                candidate['name'], candidate['email'], candidate['role'], candidate['time_str'],
+                candidate.get('event_id'), candidate.get('requested')
+            )
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(enumerate(pool.map(create, candidates)))
+
+    def query_free_busy(self, time_min, time_max):
+        """Returns busy (start, end) blocks on the primary calendar as naive local datetimes."""
+        tz = ZoneInfo(TIMEZONE)
+        body = {
+            'timeMin': time_min.replace(tzinfo=tz).isoformat(),
+            'timeMax': time_max.replace(tzinfo=tz).isoformat(),
+            'timeZone': TIMEZONE,
+            'items': [{'id': 'primary'}],
+        }
+        try:
+            result = self.service.freebusy().query(body=body).execute()
+        except HttpError as error:
+            print(f"freeBusy query failed, continuing without calendar conflicts: {error}")
+            return []
+
+        blocks = []
+        for block in result.get('calendars', {}).get('primary', {}).get('busy', []):
+            start = datetime.datetime.fromisoformat(block['start'].replace('Z', '+00:00'))
+            end = datetime.datetime.fromisoformat(block['end'].replace('Z', '+00:00'))
+            blocks.append((start.astimezone(tz).replace(tzinfo=None), end.astimezone(tz).replace(tzinfo=None)))
+        return blocks
+
+    def list_agent_events(self, time_min, time_max):
+        """Interview events this agent created (deterministic "ahr" IDs) in the window, as {event_id: event}."""
+        tz = ZoneInfo(TIMEZONE)
+        events = {}
+        page_token = None
+        try:
+            while True:
+                result = self.service.events().list(
+                    calendarId='primary',
+                    timeMin=time_min.replace(tzinfo=tz).isoformat(),
+                    timeMax=time_max.replace(tzinfo=tz).isoformat(),
+                    singleEvents=True,
+                    maxResults=2500,
+                    pageToken=page_token
+                ).execute()
+                for event in result.get('items', []):
+                    if not event.get('id', '').startswith('ahr') or event.get('status') == 'cancelled':
+                        continue
+                    if 'dateTime' not in event.get('start', {}):
+                        continue
+                    events[event['id']] = event
+                page_token = result.get('nextPageToken')
+                if not page_token:
+                    return events
+        except HttpError as error:
+            print(f"Listing existing interviews failed, continuing without them: {error}")
+            return events
+
+    def to_local(self, when):
+        """Calendar {dateTime, timeZone} -> naive datetime in TIMEZONE."""
+        tz = ZoneInfo(TIMEZONE)
+        moment = datetime.datetime.fromisoformat(when['dateTime'].replace('Z', '+00:00'))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=ZoneInfo(when.get('timeZone') or TIMEZONE))
+        return moment.astimezone(tz).replace(tzinfo=None)
+
+    def allocate_slots(self, candidates):
+        """
+        Moves candidates whose requested slot collides with existing commitments
+        to the nearest free slot in working hours. The agent's own interview
+        events (events.list, keyed by their deterministic IDs) each take one
+        interviewer seat, except the candidates' own bookings; every other
+        busy block from freeBusy takes the whole capacity. Updates each
+        candidate's time_str in place.
+        """
+        requested = {}
+        for index, candidate in enumerate(candidates):
+            start = self.parse_datetime(candidate['time_str'])
+            if start:
+                requested[index] = start
+        if not requested:
+            return
+
+        allocator = SlotAllocator(
+            duration_minutes=self.duration_minutes,
+            capacity=self.interviewer_capacity,
+            work_start_hour=self.work_start_hour,
+            work_end_hour=self.work_end_hour
+        )
+        own_ids = set()
+        for index in requested:
+            candidate = candidates[index]
+            own_ids.add(self.stable_event_id(candidate))
+            if candidate.get('event_id'):
+                own_ids.add(candidate['event_id'])
+
+        window_start, window_end = self.event_window(requested.values(), allocator.search_window)
+        agent_events = {
+            event_id: (self.to_local(event['start']), self.to_local(event['end']))
+            for event_id, event in self.list_agent_events(window_start, window_end).items()
+        }
+        for event_id, (start, end) in agent_events.items():
+            if event_id not in own_ids:
+                allocator.add_busy(start, end, label=event_id, blocking=False)
+
+        # freeBusy merges the agent's interviews with anything adjacent, so cut
+        # them out of the busy blocks rather than matching blocks one to one.
+        busy = self.query_free_busy(window_start, window_end)
+        for start, end in subtract_intervals(busy, agent_events.values()):
+            allocator.add_busy(start, end, label="busy", blocking=True)
+
+        allocation = allocator.allocate(list(requested.items()))
+        for index, slot in allocation.items():
+            candidate = candidates[index]
+            if slot is None:
+                print(f"No free slot found near {candidate['time_str']} for {candidate['name']}; keeping requested time.")
+                continue
+            if slot != requested[index]:
+                new_time = slot.strftime("%d-%m-%Y %I:%M %p")
+                print(f"Conflict for {candidate['name']} at {candidate['time_str']}; moved to {new_time}")
+                candidate['time_str'] = new_time
+
+    def event_window(self, starts, search_window):
+        """The calendar range the allocator can look at around the requested times."""
+        starts = list(starts)
+        return min(starts) - datetime.timedelta(days=1), max(starts) + search_window
+
+    def recover_events(self, candidates):
+        """
+        Finds interviews booked on an earlier run that the event cache does not
+        know about (cache deleted, or another machine). Returns {position: event}
+        for candidates whose current request already has its event; candidates
+        with an event from an older request get its event_id, so it is patched
+        instead of booked a second time.
+        """
+        starts = [self.parse_datetime(candidate['requested']) for candidate in candidates]
+        starts = [start for start in starts if start]
+        if not starts:
+            return {}
+        events = self.list_agent_events(*self.event_window(starts, SlotAllocator().search_window))
+
+        by_email = {}
+        for event_id, event in events.items():
+            for attendee in event.get('attendees', []):
+                by_email.setdefault(str(attendee.get('email', '')).lower(), []).append(event_id)
+
+        found = {}
+        for position, candidate in enumerate(candidates):
+            if candidate.get('event_id'):
+                continue
+            stable_id = self.stable_event_id(candidate)
+            if stable_id in events:
+                found[position] = events[stable_id]
+                continue
+            older = by_email.get(candidate['email'].lower())
+            if older:
+                candidate['event_id'] = older[0]
+        return found
+
     def process_interviews(self):
         print("--- Calendar Agent ---")
         if not self.authenticate():
@@ -171,8 +601,7 @@ class CalendarAgent:
         df = pd.read_excel(self.data_path)
         print(f"Found {len(df)} candidates to schedule.")
         
-        final_schedule = []
-        count = 0
+        candidates = []
         for index, row in df.iterrows():
             name = row.get('Candidate Name')
             email = row.get('Email')
@@ -180,23 +609,77 @@ class CalendarAgent:
             time_str = row.get('Scheduled Time')
             
             # Basic validation
-            if not isinstance(time_str, str) or not email or "@" not in email:
+            if not isinstance(time_str, str) or not isinstance(email, str) or "@" not in email:
                 print(f"Skipping {name}: Missing valid time/email.")
                 continue
 
-            print(f"Scheduling {name} for {time_str}...", end="\r")
-            meet_link = self.create_meeting(name, email, role, time_str)
-            
+            candidates.append({"name": name, "email": email, "role": role, "time_str": time_str, "requested": time_str})
+
+        # Cached candidates whose request has not changed keep their booking and
+        # stay out of allocation, so re-runs send nothing for them.
+        self.event_cache = self.load_event_cache()
+        links = {}
+        to_send = []
+        for index, candidate in enumerate(candidates):
+            cached = self.event_cache.get(self.candidate_key(candidate['name'], candidate['email']))
+            unchanged = cached and candidate['time_str'] in (cached.get('requested_time'), cached.get('scheduled_time'))
+            if unchanged and cached.get('meet_link'):
+                candidate['time_str'] = cached.get('scheduled_time') or candidate['time_str']
+                print(f"Already scheduled {candidate['name']} for {candidate['time_str']}; skipping.")
+                links[index] = cached['meet_link']
+                continue
+            if cached and cached.get('event_id'):
+                candidate['event_id'] = cached['event_id']
+            to_send.append(index)
+
+        recovered = self.recover_events([candidates[index] for index in to_send])
+        for position, event in recovered.items():
+            index = to_send[position]
+            candidate = candidates[index]
+            candidate['time_str'] = self.to_local(event['start']).strftime("%d-%m-%Y %I:%M %p")
+            links[index] = self.remember_event(
+                candidate['name'], candidate['email'], candidate['time_str'], event, candidate['requested']
+            )
+            print(f"Found existing booking for {candidate['name']} at {candidate['time_str']}; skipping.")
+        to_send = [index for position, index in enumerate(to_send) if position not in recovered]
+
+        pending = [candidates[index] for index in to_send]
+        if self.use_allocator:
+            self.allocate_slots(pending)
+
+        if self.batch_mode:
+            print(f"Scheduling {len(pending)} candidates in batches of {self.batch_size}...")
+            sent = self.create_meetings_batch(pending)
+        elif self.workers > 1:
+            print(f"Scheduling {len(pending)} candidates with {self.workers} workers (max {self.max_qps} req/s)...")
+            sent = self.create_meetings_concurrent(pending)
+        else:
+            sent = {}
+            for position, candidate in enumerate(pending):
+                print(f"Scheduling {candidate['name']} for {candidate['time_str']}...", end="\r")
+                sent[position] = self.create_meeting(
+                    candidate['name'], candidate['email'], candidate['role'], candidate['time_str'],
+                    candidate.get('event_id'), candidate.get('requested')
+                )
+
+        for position, index in enumerate(to_send):
+            links[index] = sent.get(position)
+        self.save_event_cache()
+
+        final_schedule = []
+        count = 0
+        for index, candidate in enumerate(candidates):
+            meet_link = links.get(index)
             if meet_link:
                 final_schedule.append({
-                    "Candidate Name": name,
-                    "Role": role,
-                    "Scheduled Time": time_str,
+                    "Candidate Name": candidate['name'],
+                    "Role": candidate['role'],
+                    "Scheduled Time": candidate['time_str'],
                     "Meeting Link": meet_link
                 })
                 count += 1
                 
-        print(f"\nScheduling complete. {count} invites sent.")
+        print(f"\nScheduling complete. {count} interviews on calendar ({len(to_send)} created or updated).")
         
         if final_schedule:
             output_file = os.path.join(self.root_dir, "data", "final_interview_schedule.xlsx")
@@ -0,0 +1,171 @@
+"""
+Call Tracker
+------------
+Persists the outcome of every outbound call (from Twilio statusCallback
+events) and keeps a retry queue, so a calling campaign converges on full
+coverage without re-running the whole shortlist.
+
+- calls:   one row per CallSid with its latest status
+- retries: one row per phone number; a no-answer / busy / failed call
+           schedules a redial with exponential backoff, moved into the
+           allowed time-of-day window. A completed or canceled call clears it.
+           A claim that is never confirmed (the worker died mid-dial) is
+           handed out again after `claim_timeout` seconds.
+
+Stored in a local SQLite file (WAL), so any voice server worker can record
+status events and claim due retries without double-dialling.
+"""
+
+import os
+import time
+import sqlite3
+import datetime
+import threading
+
+RETRY_STATUSES = {"no-answer", "busy", "failed"}
+TERMINAL_STATUSES = {"completed", "no-answer", "busy", "failed", "canceled"}
+
+
+def parse_window(window):
+    """'09:00-19:00' -> (datetime.time(9, 0), datetime.time(19, 0)); empty -> None (any time)."""
+    if not window:
+        return None
+    start, end = (datetime.datetime.strptime(part.strip(), "%H:%M").time() for part in window.split("-"))
+    return start, end
+
+
+class CallTracker:
+    def __init__(self, path, max_attempts=3, base_delay=600, max_delay=7200, window="09:00-19:00", claim_timeout=300):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.window = parse_window(window)
+        self.claim_timeout = claim_timeout
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS calls ("
+            " call_sid TEXT PRIMARY KEY, candidate TEXT, to_number TEXT, status TEXT,"
+            " attempt INTEGER, duration INTEGER, updated_at REAL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS retries ("
+            " to_number TEXT PRIMARY KEY, candidate TEXT, role TEXT, salary_range TEXT, server_url TEXT,"
+            " attempt INTEGER, last_status TEXT, due_at REAL, state TEXT, claimed_at REAL)"
+        )
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(retries)")}
+        if "claimed_at" not in columns:  # queue files from before claims were timestamped
+            self.db.execute("ALTER TABLE retries ADD COLUMN claimed_at REAL")
+
+    def next_allowed(self, timestamp):
+        """Moves a timestamp forward into the calling window (local time)."""
+        if not self.window:
+            return timestamp
+        start, end = self.window
+        moment = datetime.datetime.fromtimestamp(timestamp)
+        if start <= moment.time() < end:
+            return timestamp
+        day = moment.date() if moment.time() < start else moment.date() + datetime.timedelta(days=1)
+        return datetime.datetime.combine(day, start).timestamp()
+
+    def backoff(self, attempt):
+        return min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    def record(self, call_sid, status, candidate, to_number, role, salary_range, server_url, attempt=1, duration=None):
+        """
+        Stores a status event. Returns "retry" if a redial was queued, "done"
+        when the candidate was reached or ran out of attempts, else None.
+        """
+        now = time.time()
+        with self.lock:
+            row = self.db.execute("SELECT status FROM calls WHERE call_sid = ?", (call_sid,)).fetchone()
+            if row and row[0] in TERMINAL_STATUSES:
+                return None  # late or duplicate event after the final one
+            self.db.execute(
+                "INSERT INTO calls (call_sid, candidate, to_number, status, attempt, duration, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(call_sid) DO UPDATE SET"
+                " status = excluded.status, duration = COALESCE(excluded.duration, duration), updated_at = excluded.updated_at",
+                (call_sid, candidate, to_number, status, attempt, duration, now)
+            )
+            if status in ("completed", "canceled"):
+                # Reached, or the call was cancelled on purpose: stop redialling.
+                self.db.execute("DELETE FROM retries WHERE to_number = ?", (to_number,))
+                return "done"
+            if status not in RETRY_STATUSES:
+                # Twilio has the redial, so the claim no longer needs a timeout.
+                self.db.execute("UPDATE retries SET state = 'placed' WHERE to_number = ? AND state = 'dialing'", (to_number,))
+                return None
+            if attempt >= self.max_attempts:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO retries (to_number, candidate, role, salary_range, server_url, attempt, last_status, due_at, state)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, NULL, 'exhausted')",
+                    (to_number, candidate, role, salary_range, server_url, attempt, status)
+                )
+                return "done"
+            due_at = self.next_allowed(now + self.backoff(attempt))
+            self.db.execute(
+                "INSERT OR REPLACE INTO retries (to_number, candidate, role, salary_range, server_url, attempt, last_status, due_at, state)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'pending')",
+                (to_number, candidate, role, salary_range, server_url, attempt + 1, status, due_at)
+            )
+            return "retry"
+
+    def claim_due(self, limit=20):
+        """
+        Atomically claims retries that are due (and inside the window) for this
+        worker, plus claims left in 'dialing' for over `claim_timeout` seconds.
+        """
+        now = time.time()
+        if self.next_allowed(now) != now:
+            return []
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self.db.execute(
+                    "SELECT to_number, candidate, role, salary_range, server_url, attempt FROM retries"
+                    " WHERE (state = 'pending' AND due_at <= ?) OR (state = 'dialing' AND COALESCE(claimed_at, 0) <= ?)"
+                    " ORDER BY due_at LIMIT ?",
+                    (now, now - self.claim_timeout, limit)
+                ).fetchall()
+                self.db.executemany(
+                    "UPDATE retries SET state = 'dialing', claimed_at = ? WHERE to_number = ?",
+                    [(now, r[0]) for r in rows]
+                )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        keys = ("to_number", "candidate", "role", "salary_range", "server_url", "attempt")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def dialed(self, to_number, error=None):
+        """Marks a claimed retry as placed; if the redial itself failed, schedules the next one."""
+        with self.lock:
+            if error is None:
+                self.db.execute("UPDATE retries SET state = 'placed' WHERE to_number = ?", (to_number,))
+                return
+            row = self.db.execute("SELECT attempt FROM retries WHERE to_number = ?", (to_number,)).fetchone()
+            if row is None:
+                return  # a completed call already cleared the retry
+            attempt = row[0]
+            if attempt >= self.max_attempts:
+                self.db.execute("UPDATE retries SET state = 'exhausted', last_status = ? WHERE to_number = ?", (error, to_number))
+            else:
+                self.db.execute(
+                    "UPDATE retries SET state = 'pending', attempt = attempt + 1, last_status = ?, due_at = ? WHERE to_number = ?",
+                    (error, self.next_allowed(time.time() + self.backoff(attempt)), to_number)
+                )
+
+    def summary(self):
+        with self.lock:
+            calls = dict(self.db.execute(
+                "SELECT status, COUNT(*) FROM calls WHERE call_sid IN"
+                " (SELECT call_sid FROM calls c WHERE updated_at = (SELECT MAX(updated_at) FROM calls WHERE to_number = c.to_number))"
+                " GROUP BY status"
+            ).fetchall())
+            retries = dict(self.db.execute("SELECT state, COUNT(*) FROM retries GROUP BY state").fetchall())
+        return {"latest_status_by_candidate": calls, "retries": retries}
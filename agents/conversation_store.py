@@ -0,0 +1,196 @@
+"""
+Conversation Store
+------------------
+Pluggable per-call state for the voice server, with TTL and LRU eviction.
+
+Each call's state is a JSON-serialisable dict:
+    {"history": [...], "context": {...}, "transcript": {...}, "completed": bool}
+
+Backends:
+- memory: in-process OrderedDict (single uvicorn worker)
+- sqlite: a shared local SQLite file in WAL mode, so several uvicorn
+          workers can serve webhooks for the same call
+
+Entries expire `ttl` seconds after their last update, `ended_ttl` seconds
+after the call ends, and the least recently used calls are dropped once
+more than `max_calls` are held (calls that already ended go first).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+
+class ConversationStore(ABC):
+    """Interface shared by all backends. All methods are coroutines."""
+
+    @abstractmethod
+    async def load(self, call_sid):
+        ...
+
+    @abstractmethod
+    async def save(self, call_sid, state):
+        ...
+
+    @abstractmethod
+    async def end(self, call_sid):
+        """Marks a call as ended so it is evicted after `ended_ttl`."""
+
+    @abstractmethod
+    async def evict_expired(self):
+        """Removes expired entries and returns their CallSids."""
+
+    @abstractmethod
+    async def count(self):
+        ...
+
+
+class MemoryConversationStore(ConversationStore):
+    def __init__(self, ttl=7200, ended_ttl=300, max_calls=1000):
+        self.ttl = ttl
+        self.ended_ttl = ended_ttl
+        self.max_calls = max_calls
+        self.entries = OrderedDict()
+
+    def _expired(self, entry, now):
+        if entry["ended"] is not None and now - entry["ended"] > self.ended_ttl:
+            return True
+        return now - entry["touched"] > self.ttl
+
+    async def load(self, call_sid):
+        entry = self.entries.get(call_sid)
+        if entry is None:
+            return None
+        if self._expired(entry, time.time()):
+            del self.entries[call_sid]
+            return None
+        self.entries.move_to_end(call_sid)
+        return entry["state"]
+
+    async def save(self, call_sid, state):
+        previous = self.entries.get(call_sid)
+        self.entries[call_sid] = {
+            "state": state,
+            "touched": time.time(),
+            "ended": previous["ended"] if previous else None,
+        }
+        self.entries.move_to_end(call_sid)
+
+        while len(self.entries) > self.max_calls:
+            victim = next((sid for sid, e in self.entries.items() if e["ended"] is not None), None)
+            if victim is None:
+                victim = next(iter(self.entries))
+            del self.entries[victim]
+
+    async def end(self, call_sid):
+        entry = self.entries.get(call_sid)
+        if entry is not None:
+            entry["ended"] = time.time()
+
+    async def evict_expired(self):
+        now = time.time()
+        expired = [sid for sid, entry in self.entries.items() if self._expired(entry, now)]
+        for sid in expired:
+            del self.entries[sid]
+        return expired
+
+    async def count(self):
+        return len(self.entries)
+
+
+class SQLiteConversationStore(ConversationStore):
+    def __init__(self, path, ttl=7200, ended_ttl=300, max_calls=1000):
+        self.path = path
+        self.ttl = ttl
+        self.ended_ttl = ended_ttl
+        self.max_calls = max_calls
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS conversations ("
+            " call_sid TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " touched_at REAL NOT NULL,"
+            " ended_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_conversations_touched ON conversations(touched_at)")
+
+    def _run(self, sql, params=()):
+        with self.lock:
+            return self.db.execute(sql, params).fetchall()
+
+    def _load(self, call_sid):
+        now = time.time()
+        rows = self._run(
+            "SELECT state FROM conversations WHERE call_sid = ? AND touched_at > ?"
+            " AND (ended_at IS NULL OR ended_at > ?)",
+            (call_sid, now - self.ttl, now - self.ended_ttl)
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def _save(self, call_sid, state):
+        self._run(
+            "INSERT INTO conversations (call_sid, state, touched_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(call_sid) DO UPDATE SET state = excluded.state, touched_at = excluded.touched_at",
+            (call_sid, json.dumps(state), time.time())
+        )
+
+    def _evict(self):
+        now = time.time()
+        with self.lock:
+            expired = [row[0] for row in self.db.execute(
+                "SELECT call_sid FROM conversations WHERE touched_at <= ? OR ended_at <= ?",
+                (now - self.ttl, now - self.ended_ttl)
+            ).fetchall()]
+            overflow = self.db.execute("SELECT COUNT(*) FROM conversations").fetchone()[0] - len(expired) - self.max_calls
+            if overflow > 0:
+                placeholders = ",".join("?" * len(expired)) or "''"
+                expired += [row[0] for row in self.db.execute(
+                    f"SELECT call_sid FROM conversations WHERE call_sid NOT IN ({placeholders})"
+                    " ORDER BY ended_at IS NULL, touched_at LIMIT ?",
+                    (*expired, overflow)
+                ).fetchall()]
+            self.db.executemany("DELETE FROM conversations WHERE call_sid = ?", [(sid,) for sid in expired])
+        return expired
+
+    async def load(self, call_sid):
+        return await asyncio.to_thread(self._load, call_sid)
+
+    async def save(self, call_sid, state):
+        await asyncio.to_thread(self._save, call_sid, state)
+
+    async def end(self, call_sid):
+        await asyncio.to_thread(
+            self._run, "UPDATE conversations SET ended_at = ? WHERE call_sid = ?", (time.time(), call_sid)
+        )
+
+    async def evict_expired(self):
+        return await asyncio.to_thread(self._evict)
+
+    async def count(self):
+        rows = await asyncio.to_thread(self._run, "SELECT COUNT(*) FROM conversations")
+        return rows[0][0]
+
+
+def create_store():
+    """Builds the store configured by VOICE_STATE_* environment variables."""
+    backend = os.getenv("VOICE_STATE_BACKEND", "memory").lower()
+    options = {
+        "ttl": float(os.getenv("VOICE_STATE_TTL", "7200")),
+        "ended_ttl": float(os.getenv("VOICE_STATE_ENDED_TTL", "300")),
+        "max_calls": int(os.getenv("VOICE_STATE_MAX_CALLS", "1000")),
+    }
+    if backend == "sqlite":
+        root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        path = os.getenv("VOICE_STATE_DB", os.path.join(root_dir, "data", "voice_state.db"))
+        return SQLiteConversationStore(path, **options)
+    return MemoryConversationStore(**options)
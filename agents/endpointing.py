@@ -0,0 +1,116 @@
+"""
+Adaptive Endpointing
+--------------------
+Decides when a candidate has finished speaking, for the interview agent's
+caption listener, instead of always waiting a fixed silence threshold.
+
+The silence required after the last caption change is derived from:
+- caption-stability timing: the candidate's usual gap between caption
+  updates while speaking (running mean + 2 std), so a pause is only
+  treated as the end once it is clearly longer than their normal rhythm
+- punctuation / completeness: a finished sentence ("...in Python.") ends
+  sooner, a trailing conjunction or filler ("and", "um", ",") waits the
+  full threshold
+- per-candidate corrections: if the candidate keeps talking after a turn
+  was closed, later turns wait longer
+
+Always clamped to [min_silence, max_silence]; max_silence is the old fixed
+threshold, and report() shows the turn latency saved against it.
+"""
+
+import re
+import math
+import time
+
+CONTINUATION_WORDS = {
+    "and", "but", "so", "or", "because", "since", "which", "that", "then", "like",
+    "um", "uh", "erm", "hmm", "the", "a", "an", "to", "of", "with", "for", "in", "on",
+    "my", "i", "we", "is", "was", "were", "if", "when", "also",
+}
+WORD_RE = re.compile(r"[A-Za-z']+")
+
+
+class AdaptiveEndpointer:
+    def __init__(self, mode="adaptive", min_silence=1.0, max_silence=3.0, complete_factor=0.6):
+        self.mode = mode
+        self.min_silence = min_silence
+        self.max_silence = max_silence
+        self.complete_factor = complete_factor
+        self.reset()
+
+    def reset(self):
+        """Starts a new candidate: per-candidate statistics are dropped."""
+        self.gap_count = 0
+        self.gap_mean = 0.0
+        self.gap_m2 = 0.0
+        self.patience = 1.0
+        self.last_update = None
+        self.turn_started = None
+        self.words = 0
+        self.speaking_time = 0.0
+        self.turns = []
+        self.resumed = 0
+
+    # --- statistics ---
+    def start_turn(self):
+        self.last_update = None
+        self.turn_started = None
+
+    def on_update(self, text, now=None):
+        """Records a caption change; the gaps between changes give the candidate's rhythm."""
+        now = now or time.time()
+        if self.last_update is not None:
+            gap = now - self.last_update
+            if gap < self.max_silence:
+                self.gap_count += 1
+                delta = gap - self.gap_mean
+                self.gap_mean += delta / self.gap_count
+                self.gap_m2 += delta * (gap - self.gap_mean)
+        else:
+            self.turn_started = now
+        self.last_update = now
+
+    def end_turn(self, text, silence_waited):
+        if self.turn_started is not None and self.last_update is not None:
+            self.speaking_time += self.last_update - self.turn_started
+            self.words += len(WORD_RE.findall(text))
+        self.turns.append(silence_waited)
+
+    def record_resume(self):
+        """The candidate kept talking after we closed the turn: be more patient from now on."""
+        self.resumed += 1
+        self.patience = min(self.patience * 1.25, self.max_silence / self.min_silence)
+
+    # --- decision ---
+    def required_silence(self, text):
+        """Seconds of caption stability after which `text` counts as a finished answer."""
+        if self.mode != "adaptive":
+            return self.max_silence
+
+        stripped = text.rstrip()
+        words = WORD_RE.findall(stripped.lower())
+        if not words or stripped.endswith((",", "-", "...")) or words[-1] in CONTINUATION_WORDS:
+            return self.max_silence
+
+        if self.gap_count >= 3:
+            std = math.sqrt(self.gap_m2 / (self.gap_count - 1))
+            silence = self.gap_mean + 2 * std
+        else:
+            silence = (self.min_silence + self.max_silence) / 2
+        if stripped.endswith((".", "?", "!")):
+            silence *= self.complete_factor
+        silence *= self.patience
+        return max(self.min_silence, min(self.max_silence, silence))
+
+    def report(self):
+        turns = len(self.turns)
+        waited = sum(self.turns)
+        return {
+            "mode": self.mode,
+            "turns": turns,
+            "avg_silence_s": round(waited / turns, 2) if turns else None,
+            "fixed_threshold_s": self.max_silence,
+            "latency_saved_s": round(self.max_silence * turns - waited, 1),
+            "resumed_after_endpoint": self.resumed,
+            "words_per_second": round(self.words / self.speaking_time, 2) if self.speaking_time else None,
+        }
@@ -0,0 +1,308 @@
+"""
+Fake Google Calendar Server
+---------------------------
+Local stand-in for the Google Calendar v3 API, for exercising the Calendar
+Agent's throughput and retry behaviour offline (no OAuth, no quota).
+
+Implements:
+- events.insert / events.get / events.patch / events.list
+- freeBusy.query
+- the multipart/mixed batch endpoint used by new_batch_http_request
+- conferenceData / hangoutLink generation for Meet events
+- configurable latency and error injection
+
+Run:
+    python agents/fake_calendar_server.py --port 8090 --latency-ms 150 --error-rate 0.05
+
+Then point the Calendar Agent at it:
+    CALENDAR_API_ENDPOINT=http://localhost:8090
+"""
+
+import os
+import re
+import json
+import uuid
+import random
+import asyncio
+import hashlib
+import argparse
+import datetime
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import urlsplit, parse_qs
+from zoneinfo import ZoneInfo
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, JSONResponse
+
+app = FastAPI(title="Fake Google Calendar")
+
+CONFIG = {
+    "latency_ms": float(os.getenv("FAKE_CALENDAR_LATENCY_MS", "0")),
+    "jitter_ms": float(os.getenv("FAKE_CALENDAR_JITTER_MS", "0")),
+    "error_rate": float(os.getenv("FAKE_CALENDAR_ERROR_RATE", "0")),
+    "error_statuses": [int(s) for s in os.getenv("FAKE_CALENDAR_ERROR_STATUSES", "429,503").split(",")],
+}
+
+calendars = {}
+stats = {"http_requests": 0, "batch_requests": 0, "operations": 0, "injected_errors": 0}
+
+EVENT_ID_RE = re.compile(r"^[a-v0-9]{5,1024}$")
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 409: "Conflict",
+           429: "Too Many Requests", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def error_body(status, message, reason="backendError"):
+    return {"error": {"code": status, "message": message, "errors": [{"reason": reason, "message": message}]}}
+
+
+def to_utc(when):
+    """Converts an event start/end dict or RFC3339 string to an aware UTC datetime."""
+    if isinstance(when, dict):
+        if "dateTime" not in when:
+            return datetime.datetime.fromisoformat(when["date"]).replace(tzinfo=datetime.timezone.utc)
+        value = datetime.datetime.fromisoformat(when["dateTime"].replace("Z", "+00:00"))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=ZoneInfo(when.get("timeZone", "UTC")))
+    else:
+        value = datetime.datetime.fromisoformat(when.replace("Z", "+00:00"))
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def rfc3339(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def meet_code(seed):
+    digest = hashlib.sha1(seed.encode("utf-8")).hexdigest()
+    letters = "".join(chr(ord("a") + int(c, 16) % 26) for c in digest[:10])
+    return f"{letters[:3]}-{letters[3:7]}-{letters[7:10]}"
+
+
+def add_conference(event, request_id):
+    code = meet_code(request_id)
+    link = f"https://meet.google.com/{code}"
+    event["hangoutLink"] = link
+    event["conferenceData"] = {
+        "createRequest": {
+            "requestId": request_id,
+            "conferenceSolutionKey": {"type": "hangoutsMeet"},
+            "status": {"statusCode": "success"},
+        },
+        "entryPoints": [{"entryPointType": "video", "uri": link, "label": link.replace("https://", "")}],
+        "conferenceSolution": {"key": {"type": "hangoutsMeet"}, "name": "Google Meet"},
+        "conferenceId": code,
+    }
+
+
+# ---------------------------------------------------------------------- #
+# API operations
+# ---------------------------------------------------------------------- #
+def insert_event(calendar_id, query, body):
+    events = calendars.setdefault(calendar_id, {})
+    event_id = body.get("id") or uuid.uuid4().hex
+    if not EVENT_ID_RE.match(event_id):
+        return 400, error_body(400, "Invalid resource id value.", "invalid")
+    if event_id in events:
+        return 409, error_body(409, "The requested identifier already exists.", "duplicate")
+    if "start" not in body or "end" not in body:
+        return 400, error_body(400, "Missing time range.", "required")
+
+    now = rfc3339(datetime.datetime.now(datetime.timezone.utc))
+    event = dict(body)
+    event.update({
+        "kind": "calendar#event",
+        "id": event_id,
+        "status": "confirmed",
+        "htmlLink": f"https://www.google.com/calendar/event?eid={event_id}",
+        "created": now,
+        "updated": now,
+        "organizer": {"email": calendar_id, "self": True},
+    })
+    event.pop("conferenceData", None)
+    create = (body.get("conferenceData") or {}).get("createRequest")
+    if create and query.get("conferenceDataVersion") == "1":
+        add_conference(event, create.get("requestId") or event_id)
+    events[event_id] = event
+    return 200, event
+
+
+def get_event(calendar_id, event_id):
+    event = calendars.get(calendar_id, {}).get(event_id)
+    if not event:
+        return 404, error_body(404, "Not Found", "notFound")
+    return 200, event
+
+
+def patch_event(calendar_id, event_id, body):
+    event = calendars.get(calendar_id, {}).get(event_id)
+    if not event:
+        return 404, error_body(404, "Not Found", "notFound")
+    for key, value in body.items():
+        if key not in ("id", "kind", "conferenceData"):
+            event[key] = value
+    event["updated"] = rfc3339(datetime.datetime.now(datetime.timezone.utc))
+    return 200, event
+
+
+def list_events(calendar_id, query):
+    items = list(calendars.get(calendar_id, {}).values())
+    if query.get("timeMin"):
+        low = to_utc(query["timeMin"])
+        items = [e for e in items if to_utc(e["end"]) > low]
+    if query.get("timeMax"):
+        high = to_utc(query["timeMax"])
+        items = [e for e in items if to_utc(e["start"]) < high]
+    if query.get("q"):
+        needle = query["q"].lower()
+        items = [e for e in items if needle in json.dumps(e).lower()]
+    items.sort(key=lambda e: to_utc(e["start"]) if query.get("orderBy") == "startTime" else e["updated"])
+
+    offset = int(query.get("pageToken") or 0)
+    page_size = int(query.get("maxResults") or 250)
+    page = items[offset:offset + page_size]
+    result = {"kind": "calendar#events", "summary": calendar_id, "items": page}
+    if offset + page_size < len(items):
+        result["nextPageToken"] = str(offset + page_size)
+    return 200, result
+
+
+def free_busy(body):
+    low, high = to_utc(body["timeMin"]), to_utc(body["timeMax"])
+    result = {"kind": "calendar#freeBusy", "timeMin": rfc3339(low), "timeMax": rfc3339(high), "calendars": {}}
+    for item in body.get("items", []):
+        intervals = sorted(
+            (max(to_utc(e["start"]), low), min(to_utc(e["end"]), high))
+            for e in calendars.get(item["id"], {}).values()
+            if e.get("transparency") != "transparent" and to_utc(e["start"]) < high and to_utc(e["end"]) > low
+        )
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        result["calendars"][item["id"]] = {"busy": [{"start": rfc3339(s), "end": rfc3339(e)} for s, e in merged]}
+    return 200, result
+
+
+def dispatch(method, path, query, body):
+    """Routes one Calendar API call. Returns (status, json_body)."""
+    stats["operations"] += 1
+    if CONFIG["error_rate"] and random.random() < CONFIG["error_rate"]:
+        stats["injected_errors"] += 1
+        status = random.choice(CONFIG["error_statuses"])
+        return status, error_body(status, "Injected error", "rateLimitExceeded" if status == 429 else "backendError")
+
+    parts = [p for p in path.split("/") if p]
+    if parts[:2] == ["calendar", "v3"]:
+        parts = parts[2:]
+
+    if parts == ["freeBusy"] and method == "POST":
+        return free_busy(body)
+    if len(parts) >= 3 and parts[0] == "calendars" and parts[2] == "events":
+        calendar_id = parts[1]
+        if len(parts) == 3 and method == "POST":
+            return insert_event(calendar_id, query, body)
+        if len(parts) == 3 and method == "GET":
+            return list_events(calendar_id, query)
+        if len(parts) == 4 and method == "GET":
+            return get_event(calendar_id, parts[3])
+        if len(parts) == 4 and method in ("PATCH", "PUT"):
+            return patch_event(calendar_id, parts[3], body)
+    return 404, error_body(404, f"No fake handler for {method} {path}", "notFound")
+
+
+async def simulate_latency():
+    delay = CONFIG["latency_ms"] + random.uniform(0, CONFIG["jitter_ms"])
+    if delay > 0:
+        await asyncio.sleep(delay / 1000.0)
+
+
+# ---------------------------------------------------------------------- #
+# HTTP routes
+# ---------------------------------------------------------------------- #
+@app.api_route("/calendar/v3/{path:path}", methods=["GET", "POST", "PATCH", "PUT"])
+async def calendar_api(path: str, request: Request):
+    stats["http_requests"] += 1
+    await simulate_latency()
+    raw = await request.body()
+    body = json.loads(raw) if raw else {}
+    status, result = dispatch(request.method, f"/calendar/v3/{path}", dict(request.query_params), body)
+    return JSONResponse(result, status_code=status)
+
+
+@app.post("/batch/calendar/v3")
+@app.post("/batch")
+async def batch(request: Request):
+    """Handles a multipart/mixed batch in a single round trip."""
+    stats["http_requests"] += 1
+    stats["batch_requests"] += 1
+    await simulate_latency()
+
+    raw = await request.body()
+    content_type = request.headers.get("content-type", "")
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + raw)
+    if not message.is_multipart():
+        return JSONResponse(error_body(400, "Expected multipart/mixed batch"), status_code=400)
+
+    boundary = f"batch_{uuid.uuid4().hex}"
+    chunks = []
+    for part in message.iter_parts():
+        content_id = part.get("Content-ID", "")
+        payload = part.get_payload(decode=True).decode("utf-8")
+        head, _, inner_body = payload.replace("\r\n", "\n").partition("\n\n")
+        request_line = head.split("\n", 1)[0]
+        method, target, _ = request_line.split(" ", 2)
+        url = urlsplit(target)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = json.loads(inner_body) if inner_body.strip() else {}
+
+        status, result = dispatch(method, url.path, query, body)
+        response_id = content_id.replace("<", "<response-", 1) if content_id else ""
+        chunks.append(
+            f"--{boundary}\r\n"
+            f"Content-Type: application/http\r\n"
+            f"Content-ID: {response_id}\r\n\r\n"
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+            f"Content-Type: application/json; charset=UTF-8\r\n\r\n"
+            f"{json.dumps(result)}\r\n"
+        )
+    chunks.append(f"--{boundary}--\r\n")
+    return Response("".join(chunks), media_type=f"multipart/mixed; boundary={boundary}")
+
+
+@app.get("/_stats")
+async def get_stats():
+    return {"stats": stats, "config": CONFIG, "events": sum(len(e) for e in calendars.values())}
+
+
+@app.post("/_reset")
+async def reset():
+    calendars.clear()
+    for key in stats:
+        stats[key] = 0
+    return {"status": "reset"}
+
+
+@app.post("/_config")
+async def configure(request: Request):
+    """Changes latency / error injection at runtime."""
+    CONFIG.update(await request.json())
+    return CONFIG
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Google Calendar v3 server")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=CONFIG["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=CONFIG["jitter_ms"])
+    parser.add_argument("--error-rate", type=float, default=CONFIG["error_rate"])
+    args = parser.parse_args()
+
+    CONFIG.update({"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "error_rate": args.error_rate})
+    print(f"[FAKE CALENDAR] http://localhost:{args.port} | latency {args.latency_ms}ms | error rate {args.error_rate}")
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,90 @@
+"""
+History Manager
+---------------
+Rolling history compaction for long voice calls.
+
+The full conversation stays in state["history"] (the transcript needs it),
+but the LLM only sees:
+
+    [system prompt] + [summary of older turns] + [recent turns verbatim]
+
+Once more than `keep + batch` messages sit outside the summary, the oldest
+of them are folded into the summary by a background LLM call that runs
+between turns, so the prompt size stays bounded however long the call runs.
+
+Progress is kept in the call state:
+    state["summary"] = {"text": "...", "covered": <history messages folded, excluding the system prompt>}
+"""
+
+import asyncio
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain the running summary of a recruiting phone call between an HR assistant and a candidate. "
+    "Merge the new turns into the existing summary in under 120 words. Keep every concrete fact: "
+    "salary figures offered or asked for, objections, benefits mentioned, and any dates, times or "
+    "availability the candidate gave. Reply with the summary only."
+)
+
+
+class HistoryManager:
+    def __init__(self, store, summarize, keep=8, batch=6):
+        """
+        store:     ConversationStore holding the call state
+        summarize: coroutine (messages) -> text, used for the summary LLM call
+        keep:      most recent messages always sent verbatim (0 disables compaction)
+        batch:     extra messages allowed to accumulate before a refresh is started
+        """
+        self.store = store
+        self.summarize = summarize
+        self.keep = keep
+        self.batch = batch
+        self.pending = set()
+        self.tasks = set()
+
+    def prompt(self, state):
+        """Returns the messages to send to the LLM for the next reply."""
+        history = state["history"]
+        summary = state.get("summary")
+        if not summary:
+            return history
+        note = {"role": "system", "content": f"Summary of the call so far:\n{summary['text']}"}
+        return history[:1] + [note] + history[1 + summary["covered"]:]
+
+    def schedule_refresh(self, call_sid, state):
+        """Starts a background summary refresh if too many turns sit outside the summary."""
+        if not self.keep or call_sid in self.pending or state.get("completed"):
+            return
+        history = state["history"]
+        covered = (state.get("summary") or {}).get("covered", 0)
+        if len(history) - 1 - covered <= self.keep + self.batch:
+            return
+        self.pending.add(call_sid)
+        task = asyncio.create_task(self._refresh(call_sid, state, len(history) - self.keep))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _refresh(self, call_sid, state, end):
+        try:
+            summary = state.get("summary") or {"text": "", "covered": 0}
+            turns = "".join(f"{m['role'].upper()}: {m['content']}\n" for m in state["history"][1 + summary["covered"]:end])
+            text = await self.summarize([
+                {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                {"role": "user", "content": f"Existing summary:\n{summary['text'] or '(none)'}\n\nNew turns:\n{turns}"},
+            ])
+            refreshed = {"text": text.strip(), "covered": end - 1}
+
+            # The caller's dict (held by a websocket for the whole call) and the
+            # stored copy (read by the next webhook) both need the new summary.
+            state["summary"] = refreshed
+            stored = await self.store.load(call_sid)
+            if stored is not None and stored is not state and len(stored["history"]) >= end:
+                if (stored.get("summary") or {}).get("covered", 0) < refreshed["covered"]:
+                    stored["summary"] = refreshed
+                    await self.store.save(call_sid, stored)
+            elif stored is state:
+                await self.store.save(call_sid, state)
+            print(f"[HISTORY] {call_sid}: summarised {refreshed['covered']} message(s)")
+        except Exception as e:
+            print(f"[ERROR] Summarising call {call_sid}: {e}")
+        finally:
+            self.pending.discard(call_sid)
@@ -1,14 +1,21 @@
 import os
+import re
 import time
 import requests
 import json
 import sys
 from datetime import datetime, timedelta
 import pandas as pd
-from playwright.sync_api import sync_playwright
 import schedule
 from dotenv import load_dotenv
 
+try:
+    from endpointing import AdaptiveEndpointer
+    from browser_pool import BrowserPool
+except ImportError:
+    from agents.endpointing import AdaptiveEndpointer
+    from agents.browser_pool import BrowserPool
+
 load_dotenv()
 
 
@@ -50,40 +57,435 @@ class GroqClient:
             print(f"[ERROR] Groq API error: {e}")
             return None
 
+    def chat_stream(self, messages, temperature=0.7, max_tokens=200):
+        """Like chat(), but yields the reply in pieces as tokens arrive (server-sent events)."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True
+        }
+
+        try:
+            with requests.post(
+                f"{self.api_url}/chat/completions",
+                headers=headers,
+                json=payload,
+                timeout=30,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    line = line.decode("utf-8").strip()
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+        except Exception as e:
+            print(f"[ERROR] Groq API streaming error: {e}")
+
+
+class SentenceChunker:
+    """Cuts a stream of LLM text deltas into complete sentences for speech."""
+
+    SENTENCE_END_RE = re.compile(r"[.!?]+[\"')\]]*\s+")
+    ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "e.g", "i.e", "etc", "vs"}
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, delta):
+        """Adds a delta; returns the sentences it completed."""
+        self.buffer += delta
+        sentences = []
+        start = 0
+        for match in self.SENTENCE_END_RE.finditer(self.buffer):
+            words = self.buffer[start:match.start()].split()
+            if words and words[-1].lower() in self.ABBREVIATIONS:
+                continue
+            sentence = self.buffer[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        """The trailing text once the stream has ended."""
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+CAPTION_SELECTORS = [
+    '[jsname="tgaKEf"] span',
+    '.a4cQT',
+    '[data-message-text]',
+    '.iOzk7',
+    '[jscontroller="LQRnv"] span'
+]
+
+# Injected into Meet: a MutationObserver that pushes the caption text to
+# Python (through the exposed binding) whenever it changes, instead of
+# Python querying the DOM on a timer. Same selector logic as get_latest_caption.
+CAPTION_OBSERVER_SCRIPT = """
+(selectors) => {
+    if (window.__agenticCaptionObserver) return;
+    let last = "";
+    let scheduled = false;
+    const read = () => {
+        for (const selector of selectors) {
+            const elements = document.querySelectorAll(selector);
+            if (elements.length) {
+                const texts = Array.from(elements).slice(-5).map(e => e.innerText.trim()).filter(Boolean);
+                if (texts.length) return texts.join(" ");
+            }
+        }
+        return "";
+    };
+    const flush = () => {
+        scheduled = false;
+        const text = read();
+        if (text !== last) {
+            last = text;
+            window.__agenticCaption(text);
+        }
+    };
+    window.__agenticCaptionObserver = new MutationObserver(() => {
+        if (!scheduled) {
+            scheduled = true;
+            setTimeout(flush, 30);  // coalesce bursts of DOM mutations
+        }
+    });
+    window.__agenticCaptionObserver.observe(document, {childList: true, subtree: true, characterData: true});
+    flush();
+}
+"""
+
+
+# Streaming speech: sentences are queued one at a time while the LLM is still
+# generating, and SPEECH_DRAIN_SCRIPT resolves once the queue has been spoken.
+# Utterances are kept referenced: Chrome drops onend for garbage-collected ones.
+SPEECH_ENQUEUE_SCRIPT = """
+([sentence, rate, reset]) => {
+    if (reset || !window.__agenticSpeech) {
+        window.__agenticSpeech = {pending: 0, waiters: [], utterances: [], outcome: "end", started: performance.now()};
+    }
+    const queue = window.__agenticSpeech;
+    const settle = () => {
+        queue.pending -= 1;
+        if (queue.pending === 0) queue.waiters.splice(0).forEach(wake => wake());
+    };
+    const utterance = new SpeechSynthesisUtterance(sentence);
+    utterance.rate = rate;
+    utterance.volume = 1.0;
+    utterance.onend = settle;
+    utterance.onerror = (event) => { queue.outcome = "error: " + event.error; settle(); };
+    queue.pending += 1;
+    queue.utterances.push(utterance);
+    window.speechSynthesis.speak(utterance);
+}
+"""
+
+# Same queue as SPEECH_ENQUEUE_SCRIPT, but plays pre-rendered audio (a data: URL)
+# through the page's own audio output. Chromium sends that to its PulseAudio
+# sink; speechSynthesis is played by the OS speech daemon and would not follow
+# the browser onto an interview's audio route.
+SPEECH_AUDIO_ENQUEUE_SCRIPT = """
+([audioUrl, reset]) => {
+    if (reset || !window.__agenticSpeech) {
+        window.__agenticSpeech = {pending: 0, waiters: [], utterances: [], outcome: "end", started: performance.now()};
+    }
+    const queue = window.__agenticSpeech;
+    const settle = () => {
+        queue.pending -= 1;
+        if (queue.pending === 0) queue.waiters.splice(0).forEach(wake => wake());
+    };
+    queue.pending += 1;
+    queue.chain = (queue.chain || Promise.resolve()).then(() => new Promise(done => {
+        const audio = new Audio(audioUrl);
+        queue.audio = audio;
+        audio.onended = done;
+        audio.onerror = () => { queue.outcome = "error: audio"; done(); };
+        audio.play().catch(error => { queue.outcome = "error: " + error.name; done(); });
+    })).then(settle);
+}
+"""
+
+SPEECH_DRAIN_SCRIPT = """
+(timeoutMs) => new Promise(resolve => {
+    const queue = window.__agenticSpeech;
+    if (!queue) return resolve({outcome: "empty", seconds: 0});
+    let timer = null;
+    const finish = (outcome) => {
+        clearTimeout(timer);
+        resolve({outcome, seconds: (performance.now() - queue.started) / 1000});
+    };
+    if (queue.pending === 0) return finish(queue.outcome);
+    timer = setTimeout(() => {
+        window.speechSynthesis.cancel();
+        if (queue.audio) queue.audio.pause();
+        finish("timeout");
+    }, timeoutMs);
+    queue.waiters.push(() => finish(queue.outcome));
+})
+"""
+
+# Polling reads: same selector logic as the caption observer, read once.
+CAPTION_READ_SCRIPT = """
+(selectors) => {
+    for (const selector of selectors) {
+        const elements = document.querySelectorAll(selector);
+        if (elements.length) {
+            const texts = Array.from(elements).slice(-5).map(e => e.innerText.trim()).filter(Boolean);
+            if (texts.length) return texts.join(" ");
+        }
+    }
+    return "";
+}
+"""
+
+JOIN_BUTTON = "button:has-text('Join now'), button:has-text('Ask to join')"
+
+
+class Pause:
+    """Page step: waits `seconds`; with wake_on_caption the wait ends at the next caption change."""
+
+    def __init__(self, seconds, wake_on_caption=False):
+        self.seconds = max(seconds, 0)
+        self.wake_on_caption = wake_on_caption
+
+
+def run_steps(steps, page):
+    """
+    Runs a page-step generator (see Interview) on the sync Playwright API.
+    Sync calls have already run when they are yielded, so their results go
+    straight back; a Pause waits on the page, which keeps caption pushes
+    flowing to the listener.
+    """
+    result = None
+    while True:
+        try:
+            step = steps.send(result)
+        except StopIteration as done:
+            return done.value
+        result = None
+        if isinstance(step, Pause):
+            page.wait_for_timeout(step.seconds * 1000)
+        else:
+            result = step
+
+
+class CaptionParser:
+    """
+    Incremental speaker-block parser for the caption text stream.
+
+    Each update only scans the text added since the previous one: complete
+    lines are committed through a small state machine ("You" starts an agent
+    block, a two-word capitalised name starts a candidate block, anything else
+    extends the current block), and the trailing partial line - which Meet
+    may still revise - is kept aside until its newline arrives. The last
+    ANCHOR committed characters locate the committed point in the next
+    update: when the caption window scrolls (older elements drop off the
+    front) they are found further left and parsing carries on from there.
+    Only if they are gone or were rewritten does the parser resync from the
+    full text.
+    """
+
+    NOISE = {'language', 'English', 'format_size', 'Font size',
+             'circle', 'Font color', 'settings', 'Open caption settings', 'You'}
+    ANCHOR = 64
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.text = ""
+        self.committed = 0            # text[:committed] is fully parsed (ends at a newline)
+        self.in_candidate_block = False
+        self.block = []               # committed lines of the latest candidate block
+        self.pending = ""             # trailing partial line
+
+    def _classify(self, line):
+        """Returns ('agent'|'candidate'|'noise'|'text', stripped line)."""
+        stripped = line.strip()
+        if stripped in self.NOISE:
+            return ("agent" if stripped == 'You' else "noise"), stripped
+        words = stripped.split()
+        if len(words) == 2 and all(w[0].isupper() for w in words if w):
+            return "candidate", stripped
+        return "text", stripped
+
+    def _commit(self, line):
+        kind, stripped = self._classify(line)
+        if kind == "agent":
+            self.in_candidate_block = False
+            self.block = []
+        elif kind == "candidate":
+            self.in_candidate_block = True
+            self.block = []
+        elif kind == "text" and self.in_candidate_block and stripped:
+            self.block.append(stripped)
+            return stripped
+        return None
+
+    def feed(self, text):
+        """Consumes the latest caption text. Returns candidate lines that became stable."""
+        start = self.committed
+        anchor = max(0, start - self.ANCHOR)
+        tail = self.text[anchor:start]
+        if len(text) < start or text[anchor:start] != tail:
+            # Scrolled: the same committed text now ends further left.
+            moved = text.rfind(tail, 0, start) if tail else -1
+            if moved >= 0:
+                start = moved + len(tail)
+            else:
+                self.reset()
+                start = 0
+
+        self.text = text
+        stable = []
+        newline = text.rfind('\n', start)
+        if newline >= 0:
+            for line in text[start:newline].split('\n'):
+                committed = self._commit(line)
+                if committed:
+                    stable.append(committed)
+            self.committed = newline + 1
+        else:
+            self.committed = start
+        self.pending = text[self.committed:]
+        return stable
+
+    def current_response(self):
+        """The latest candidate response, including the still-changing last line."""
+        kind, stripped = self._classify(self.pending)
+        if kind in ("agent", "candidate") or not self.in_candidate_block:
+            return ""
+        lines = self.block + [stripped] if kind == "text" and stripped else self.block
+        return ' '.join(lines).strip()
+
 
 class CaptionsListener:
-    """Reads candidate responses from Google Meet live captions (DOM-based)."""
+    """
+    Reads candidate responses from Google Meet live captions (DOM-based).
+    enable_captions, attach, check_resume and listen are page-step
+    generators (see Interview), shared by the sync agent and the async runtime.
+    """
     
-    def __init__(self):
-        self.silence_threshold = 3.0 
+    def __init__(self, prefix=""):
+        self.prefix = prefix  # log prefix, set per interview when several run at once
+        self.silence_threshold = float(os.getenv("INTERVIEW_MAX_SILENCE", "3.0"))
+        self.endpointer = AdaptiveEndpointer(
+            mode=os.getenv("INTERVIEW_ENDPOINTING", "adaptive").lower(),
+            min_silence=float(os.getenv("INTERVIEW_MIN_SILENCE", "1.0")),
+            max_silence=self.silence_threshold
+        )
+        self.closed_response = None
         self.last_caption_text = ""
         self.agent_speaking = False  
         
+        # Push mode: caption changes arrive through an exposed binding
+        self.attached_pages = set()
+        self.listening = False
+        self.last_extracted = ""
+        self.last_change_time = None
+        self.parser = CaptionParser()
+        
         print("[CONFIG] Using Google Meet Live Captions for transcription")
     
     def enable_captions(self, page):
         """Enable live captions in Google Meet using Ctrl+C shortcut."""
-        print("[CAPTIONS] Enabling live captions...")
+        print(f"{self.prefix}[CAPTIONS] Enabling live captions...")
         try:
-            page.keyboard.press("c")
-            time.sleep(1)
-            print("[OK] Captions enabled")
-            return True
+            yield page.keyboard.press("c")
+            yield Pause(1)
+            print(f"{self.prefix}[OK] Captions enabled")
         except Exception as e:
-            print(f"[ERROR] Failed to enable captions: {e}")
+            print(f"{self.prefix}[ERROR] Failed to enable captions: {e}")
             return False
+        yield from self.attach(page)
+        return True
     
+    def attach(self, page):
+        """Injects the caption MutationObserver; returns False (polling instead) if that fails."""
+        if id(page) in self.attached_pages:
+            return True
+        try:
+            yield page.expose_binding("__agenticCaption", self.on_caption)
+            script = f"({CAPTION_OBSERVER_SCRIPT})({json.dumps(CAPTION_SELECTORS)})"
+            yield page.add_init_script(script)  # survives reloads
+            yield page.evaluate(script)
+        except Exception as e:
+            print(f"{self.prefix}[WARN] Caption observer unavailable, polling instead: {e}")
+            return False
+        self.attached_pages.add(id(page))
+        print(f"{self.prefix}[CAPTIONS] Caption observer attached (push mode)")
+        return True
+
+    def detach(self, page):
+        """Forgets a meeting page (it is about to be closed) and its caption state."""
+        self.attached_pages.discard(id(page))
+        self.parser.reset()
+        self.last_caption_text = ""
+        self.closed_response = None
+
+    def on_caption(self, source, text):
+        """Binding callback: runs on each caption change while Playwright is pumping events."""
+        self.last_caption_text = text
+        if self.agent_speaking:
+            return
+        self.parser.feed(text)
+        extracted = self.parser.current_response()
+        if not self.listening:
+            self.note_resume(extracted)
+            return
+        if extracted and extracted != self.last_extracted:
+            if self.last_change_time is None:
+                print("[DETECTED] Speech detected in captions!")
+            self.last_extracted = extracted
+            self.last_change_time = time.time()
+            self.endpointer.on_update(extracted, self.last_change_time)
+            display = extracted[-60:] if len(extracted) > 60 else extracted
+            print(f"\r[CAPTION] ...{display}", end='', flush=True)
+
+    def note_resume(self, extracted):
+        """The candidate kept going after we closed their turn: endpointing was too eager."""
+        if self.closed_response and extracted.startswith(self.closed_response) and extracted != self.closed_response:
+            self.endpointer.record_resume()
+            self.closed_response = None
+
+    def check_resume(self, page):
+        """
+        Reads the captions that arrived since the turn was closed, before the
+        agent's mic goes on (captions are ignored while the agent speaks).
+        """
+        if not self.closed_response:
+            return
+        try:
+            if id(page) in self.attached_pages:
+                yield Pause(0)  # delivers queued caption pushes to on_caption
+                return
+            caption = yield page.evaluate(CAPTION_READ_SCRIPT, CAPTION_SELECTORS)
+            if caption:
+                self.parser.feed(caption)
+                self.note_resume(self.parser.current_response())
+        except Exception as e:
+            print(f"{self.prefix}[WARN] Resume check failed: {e}")
+
     def get_latest_caption(self, page):
         """Extract the latest caption text from Google Meet DOM."""
-        selectors = [
-            '[jsname="tgaKEf"] span',
-            '.a4cQT',
-            '[data-message-text]',
-            '.iOzk7',
-            '[jscontroller="LQRnv"] span'
-        ]
-        
-        for selector in selectors:
+        for selector in CAPTION_SELECTORS:
             try:
                 elements = page.query_selector_all(selector)
                 if elements:
@@ -100,36 +502,54 @@ class CaptionsListener:
         
         return ""
     def extract_last_response(self, caption_text):
-        """Extract only the LAST candidate response from accumulated captions."""
-        lines = caption_text.split('\n')
-        last_response_lines = []
-        in_candidate_block = False
-        
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            if stripped in {'language', 'English', 'format_size', 'Font size', 
-                           'circle', 'Font color', 'settings', 'Open caption settings', 'You'}:
-                if stripped == 'You':  
-                    in_candidate_block = False
-                    last_response_lines = []  
-                continue
-            words = stripped.split()
-            if len(words) == 2 and all(w[0].isupper() for w in words if w):
-                in_candidate_block = True
-                last_response_lines = []  
-                continue
-            
-            if in_candidate_block and stripped:
-                last_response_lines.append(stripped)
-        return ' '.join(last_response_lines).strip()
+        """Extract only the LAST candidate response from accumulated captions (one-off full parse)."""
+        parser = CaptionParser()
+        parser.feed(caption_text)
+        return parser.current_response()
     
     def listen(self, page, timeout=120):
         """
         Listen for candidate response via captions.
         Returns only the LAST candidate response when silence is detected.
         """
-        print(f"\n[LISTEN] Waiting for candidate response... (10s silence = done, timeout: {timeout}s)")
+        if id(page) not in self.attached_pages:
+            return self.listen_polling(page, timeout)
         
+        print(f"\n{self.prefix}[LISTEN] Waiting for candidate response... ({self.endpointer.mode} endpointing, timeout: {timeout}s)")
+        start_time = time.time()
+        self.last_extracted = ""
+        self.last_change_time = None
+        self.closed_response = None
+        self.endpointer.start_turn()
+        self.listening = True
+        try:
+            self.on_caption(None, self.last_caption_text)
+            while True:
+                now = time.time()
+                if self.last_change_time is not None:
+                    silence_duration = now - self.last_change_time
+                    required = self.endpointer.required_silence(self.last_extracted)
+                    if silence_duration >= required:
+                        return self.close_turn(self.last_extracted, silence_duration)
+                    wait = required - silence_duration
+                else:
+                    # No speech yet: wake regularly so a short answer is not missed.
+                    wait = 0.25
+                if now - start_time > timeout:
+                    print(f"\n{self.prefix}[TIMEOUT] No response detected after {timeout}s")
+                    return ""
+                wait = min(wait, timeout - (now - start_time))
+                # Caption pushes are delivered (to on_caption) while Playwright waits.
+                yield Pause(max(wait, 0.01), wake_on_caption=True)
+        finally:
+            self.listening = False
+    
+    def listen_polling(self, page, timeout=120):
+        """Polling fallback for pages where the caption observer could not be attached."""
+        print(f"\n[LISTEN] Waiting for candidate response... ({self.endpointer.mode} endpointing, timeout: {timeout}s)")
+        
+        self.closed_response = None
+        self.endpointer.start_turn()
         start_time = time.time()
         last_change_time = None
         last_caption_full = ""
@@ -147,7 +567,8 @@ class CaptionsListener:
             current_caption = self.get_latest_caption(page)
             
             if current_caption and current_caption != last_caption_full:
-                extracted = self.extract_last_response(current_caption)
+                self.parser.feed(current_caption)
+                extracted = self.parser.current_response()
                 
                 if extracted and extracted != last_extracted:
                     if not speech_detected:
@@ -156,6 +577,7 @@ class CaptionsListener:
                     
                     last_extracted = extracted
                     last_change_time = time.time()
+                    self.endpointer.on_update(extracted, last_change_time)
                     display = extracted[-60:] if len(extracted) > 60 else extracted
                     print(f"\r[CAPTION] ...{display}", end='', flush=True)
                 
@@ -164,98 +586,32 @@ class CaptionsListener:
             if speech_detected and last_change_time:
                 silence_duration = time.time() - last_change_time
                 
-                if silence_duration >= self.silence_threshold:
-                    print(f"\n[SILENCE] {silence_duration:.1f}s of silence. Response complete.")
-                    return last_extracted
+                if silence_duration >= self.endpointer.required_silence(last_extracted):
+                    return self.close_turn(last_extracted, silence_duration)
             
             time.sleep(0.1)
         
         return ""
     
+    def close_turn(self, response, silence_duration):
+        """Ends the candidate's turn and records how long we waited for it."""
+        saved = self.silence_threshold - silence_duration
+        print(f"\n{self.prefix}[SILENCE] {silence_duration:.1f}s of silence. Response complete. (saved {max(saved, 0):.1f}s vs fixed {self.silence_threshold}s)")
+        self.endpointer.end_turn(response, silence_duration)
+        self.closed_response = response
+        return response
+
     def set_agent_speaking(self, speaking: bool):
         """Set flag to ignore captions while agent is speaking."""
         self.agent_speaking = speaking
 
 
-class InterviewAgent:
-    def __init__(self):
-        # Paths
-        self.schedule_file = os.path.join(os.getcwd(), "data", "final_interview_schedule.xlsx")
-        self.transcript_dir = os.path.join(os.getcwd(), "unverified_transcripts")
-        os.makedirs(self.transcript_dir, exist_ok=True)
-        
-        self.groq = GroqClient()
-        self.captions = CaptionsListener()  
-        self.processed_meetings = set()
-        
-        print("\n" + "="*60)
-        print("[START] INTERVIEW AGENT STARTED")
-        print("="*60)
-        print(f"[CONFIG] Schedule: {self.schedule_file}")
-        print(f"[CONFIG] Transcripts: {self.transcript_dir}")
-        print(f"[CONFIG] Schedule check: Every 1 minute")
-        print(f"[CONFIG] Join: 5 minutes before meeting")
-        print(f"[CONFIG] Interview starts: 1 min after meeting time")
-        print(f"[CONFIG] Using Google Meet Live Captions (no audio)")
-        print(f"[CONFIG] Silence threshold: {self.captions.silence_threshold}s")
-        print("="*60 + "\n")
-    
-    def clean_caption_text(self, text):
-        """Clean Google Meet caption noise from text."""
-        noise_words = {
-            'language', 'English', 'format_size', 'Font size', 
-            'circle', 'Font color', 'settings', 'Open caption settings',
-            'Hindi', 'Spanish', 'French', 'German', 'You'
-        }
-        
-        lines = text.split('\n')
-        cleaned = []
-        for line in lines:
-            stripped = line.strip()
-            if stripped and stripped not in noise_words:
-                words = stripped.split()
-                if len(words) <= 2 and all(w[0].isupper() for w in words if w):
-                    continue
-                cleaned.append(stripped)
-        
-        return ' '.join(cleaned).strip()
+CLOSING_MESSAGE = "Thank you so much for your time today. We've covered everything we needed. Our team will review your application and get back to you soon. Have a great day!"
 
-    def speak(self, page, text):
-        """Use browser TTS to speak. Enables mic, speaks, then disables mic."""
-        print(f"[AGENT] {text}\n")
-        self.captions.set_agent_speaking(True)
-        print("[MIC] Enabling microphone...")
-        page.keyboard.press("Control+d")
-        time.sleep(0.5)
-        
-        safe_text = text.replace("'", "\\'").replace('"', '\\"').replace('\n', ' ')
-        script = f"""
-            const utterance = new SpeechSynthesisUtterance("{safe_text}");
-            utterance.rate = 0.9;
-            utterance.volume = 1.0;
-            window.speechSynthesis.speak(utterance);
-        """
-        try:
-            page.evaluate(script)
-            time.sleep(max(3, len(text.split()) * 0.4))
-        except Exception as e:
-            print(f"[ERROR] TTS error: {e}")
-        finally:
-            print("[MIC] Disabling microphone...")
-            page.keyboard.press("Control+d")
-            time.sleep(0.5)
-            self.captions.set_agent_speaking(False)
 
-    def conduct_interview(self, page, candidate_name, role):
-        """Main interview loop using Google Meet captions."""
-        print("\n" + "="*60)
-        print(f"[INTERVIEW] STARTING: {candidate_name}")
-        print(f"[ROLE] {role}")
-        print("="*60 + "\n")
-        print("[INFO] Enabling captions for the interview...")
-        self.captions.enable_captions(page)
-        time.sleep(1)
-        system_prompt = f"""You are an AI interviewer at Agentic HR conducting an interview with {candidate_name} for the {role} position.
+def interview_prompt(candidate_name, role):
+    """System prompt for the AI interviewer."""
+    return f"""You are an AI interviewer at Agentic HR conducting an interview with {candidate_name} for the {role} position.
 
 INTERVIEW GUIDELINES:
 1. Start with a warm welcome and ask them to introduce themselves.
@@ -273,92 +629,344 @@ Example final message: "Thank you so much for your time today, {candidate_name}.
 
 No markdown in responses."""
 
-        conversation = [{"role": "system", "content": system_prompt}]
-        
+
+class Interview:
+    """
+    One interview on one Meet page: joining, the conversation loop and
+    speech, written once for the sync agent and the async runtime.
+
+    The methods are generators of page steps: each Playwright call on the
+    page is yielded (the sync API has already run it and yields its result,
+    the async API yields an awaitable) along with Pause steps, and a driver
+    (run_steps here, run_steps_async in interview_runtime.py) executes them
+    and sends the results back.
+
+    open_reply(messages): returns a callable giving the next LLM delta, or
+                          None once the reply is complete (may be awaitable)
+    save(conversation):   saves the transcript (may return an awaitable)
+    render(sentence):     optional; returns the sentence as a data: audio URL
+                          (may be awaitable) to play in the page instead of
+                          speechSynthesis, or None if it could not be rendered
+    login_wait:           seconds to wait for a manual Google sign-in (0 = fail)
+    between_turns():      called before each listen (the sync agent pre-loads
+                          the next meeting here)
+    """
+
+    def __init__(self, page, captions, candidate_name, role, open_reply, save,
+                 streaming=True, clean=None, render=None, login_wait=0, between_turns=None, log=print):
+        self.page = page
+        self.captions = captions
+        self.candidate_name = candidate_name
+        self.role = role
+        self.open_reply = open_reply
+        self.save = save
+        self.streaming = streaming
+        self.clean = clean or (lambda text: text.strip())
+        self.render = render
+        self.login_wait = login_wait
+        self.between_turns = between_turns
+        self.log = log
+
+    def run(self, scheduled_time):
+        """Joins, waits until 1 min after the meeting time, conducts the interview and leaves."""
+        if not (yield from self.join()):
+            return None
+        yield from self.wait_until(scheduled_time + timedelta(minutes=1))
+        self.log("[START] Starting interview...")
+        conversation = yield from self.conduct()
+        self.log("[LEAVE] Leaving meeting...")
+        yield self.page.keyboard.press("Control+h")
+        yield Pause(2)
+        return conversation
+
+    def join(self):
+        """From the loaded meeting page to inside the meeting, camera and mic off."""
+        page = self.page
+        if "accounts.google.com" in page.url:
+            if not self.login_wait:
+                self.log("[ERROR] Google session missing: sign in once with INTERVIEW_MAX_CONCURRENT=1, then restart")
+                return False
+            self.log("[LOGIN REQUIRED] Please sign in to your Google account in the browser. "
+                     "Your login will be saved for future sessions.")
+            deadline = time.time() + self.login_wait
+            while "meet.google.com" not in page.url:
+                if time.time() >= deadline:
+                    self.log("[ERROR] Login timeout")
+                    return False
+                self.log(f"[WAIT] Waiting for login... {int(deadline - time.time())}s remaining")
+                yield Pause(5)
+            self.log("[OK] Login successful!")
+
+        join_btn = page.locator(JOIN_BUTTON).first
+        try:
+            yield join_btn.wait_for(timeout=15000)  # pre-join screen is ready
+        except Exception:
+            pass
+        yield page.keyboard.press("Control+e")
+        yield Pause(1)
+        yield page.keyboard.press("Control+d")
+        yield Pause(1)
+        try:
+            yield join_btn.click(timeout=10000)
+            self.log("[OK] Clicked join button")
+        except Exception:
+            self.log("[WARN] Join button not found")
+        yield Pause(3)
+        self.log("[OK] In meeting!")
+        return True
+
+    def wait_until(self, start):
+        remaining = (start - datetime.now()).total_seconds()
+        if remaining <= 0:
+            self.log("[INFO] Already past interview start time, starting now...")
+            return
+        self.log(f"[WAIT] Interview starts at {start.strftime('%H:%M')}, waiting {remaining/60:.1f} minutes...")
+        while remaining > 0:
+            if remaining > 60:
+                self.log(f"       {int(remaining/60)} minutes remaining...")
+            yield Pause(min(remaining, 60))
+            remaining = (start - datetime.now()).total_seconds()
+
+    def conduct(self):
+        """Main interview loop using Google Meet captions. Returns the conversation."""
+        candidate_name, role = self.candidate_name, self.role
+        self.log("=" * 60)
+        self.log(f"[INTERVIEW] STARTING: {candidate_name}")
+        self.log(f"[ROLE] {role}")
+        self.log("=" * 60)
+        yield from self.captions.enable_captions(self.page)
+        self.captions.endpointer.reset()
+        yield Pause(1)
+
+        conversation = [{"role": "system", "content": interview_prompt(candidate_name, role)}]
         interview_start = time.time()
-        max_duration_minutes = 40  
-        max_duration_seconds = max_duration_minutes * 60
-        
-        greeting = self.groq.chat(conversation)
+        max_duration_seconds = 40 * 60
+
+        greeting = yield from self.respond(conversation)
         if greeting:
             conversation.append({"role": "assistant", "content": greeting})
-            self.speak(page, greeting.replace("[END_INTERVIEW]", ""))
         else:
             default_greeting = f"Hello {candidate_name}! Welcome to your interview for the {role} position. Please tell me about yourself."
-            self.speak(page, default_greeting)
+            yield from self.speak(default_greeting)
             conversation.append({"role": "assistant", "content": default_greeting})
-        
+
         no_response_count = 0
-        max_no_response = 3 
+        max_no_response = 3
         turn = 0
-        
+
         while True:
             turn += 1
             elapsed = time.time() - interview_start
-            remaining_mins = (max_duration_seconds - elapsed) / 60
-            
-            print(f"\n--- Turn {turn} | Elapsed: {int(elapsed/60)}min | Remaining: {int(remaining_mins)}min ---")
-            
+            self.log(f"--- Turn {turn} | Elapsed: {int(elapsed/60)}min | Remaining: {int((max_duration_seconds - elapsed)/60)}min ---")
             if elapsed >= max_duration_seconds:
-                print("\n[TIME] 40 minutes reached, concluding interview...")
+                self.log("[TIME] 40 minutes reached, concluding interview...")
                 break
-            
-            response = self.captions.listen(page, timeout=120)
-            
+
+            if self.between_turns:
+                self.between_turns()
+            response = yield from self.captions.listen(self.page, timeout=120)
             if not response:
                 no_response_count += 1
-                print(f"[WARN] No response detected (attempt {no_response_count}/{max_no_response})")
-                
+                self.log(f"[WARN] No response detected (attempt {no_response_count}/{max_no_response})")
                 if no_response_count >= max_no_response:
-                    print("[WARN] Too many no-responses, ending interview")
+                    self.log("[WARN] Too many no-responses, ending interview")
                     break
-                
-                self.speak(page, "I didn't catch that. Please take your time and respond when you're ready.")
+                yield from self.speak("I didn't catch that. Please take your time and respond when you're ready.")
                 continue
-            
+
             no_response_count = 0
-            
-            cleaned_response = self.clean_caption_text(response)
+            cleaned_response = self.clean(response)
             if not cleaned_response:
-                print("[WARN] Response was all noise, asking to repeat")
-                self.speak(page, "I didn't catch that clearly. Could you please repeat?")
+                self.log("[WARN] Response was all noise, asking to repeat")
+                yield from self.speak("I didn't catch that clearly. Could you please repeat?")
                 continue
-            
-            print(f"[CANDIDATE] {cleaned_response}\n")
+
+            self.log(f"[CANDIDATE] {cleaned_response}")
             conversation.append({"role": "user", "content": cleaned_response})
-            
+
             limited_conversation = [conversation[0]] + conversation[-8:] if len(conversation) > 9 else conversation
-            reply = self.groq.chat(limited_conversation)
+            reply = yield from self.respond(limited_conversation)
             if reply:
                 conversation.append({"role": "assistant", "content": reply})
-                
                 if "[END_INTERVIEW]" in reply:
-                    print("\n[LLM] Interview conclusion signaled")
-                    clean_reply = reply.replace("[END_INTERVIEW]", "").strip()
-                    self.speak(page, clean_reply)
+                    self.log("[LLM] Interview conclusion signaled")
                     break
-                else:
-                    self.speak(page, reply)
             else:
-                print("[ERROR] Failed to generate reply")
+                self.log("[ERROR] Failed to generate reply")
                 break
-        
+
         if "[END_INTERVIEW]" not in str(conversation):
-            closing = "Thank you so much for your time today. We've covered everything we needed. Our team will review your application and get back to you soon. Have a great day!"
-            self.speak(page, closing)
-            conversation.append({"role": "assistant", "content": closing})
+            yield from self.speak(CLOSING_MESSAGE)
+            conversation.append({"role": "assistant", "content": CLOSING_MESSAGE})
+
+        yield self.save(conversation)
+        self.log(f"[ENDPOINT] {self.captions.endpointer.report()}")
+        self.log("[OK] Interview complete!")
+        return conversation
+
+    def respond(self, messages):
+        """Generates the next interviewer turn and speaks it; returns the raw reply or None."""
+        next_delta = self.open_reply(messages)
+        if self.streaming:
+            return (yield from self.speak_stream(next_delta))
+        reply = ""
+        while True:
+            delta = yield next_delta()
+            if delta is None:
+                break
+            reply += delta
+        if reply:
+            yield from self.speak(reply)
+        return reply or None
+
+    def speak(self, text):
+        chunks = iter([text])
+        return (yield from self.speak_stream(lambda: next(chunks, None)))
+
+    def speak_stream(self, next_delta):
+        """
+        Speaks the reply with browser TTS as it arrives: the mic goes on with
+        the first complete sentence, each sentence is queued as soon as it is
+        complete, and the mic goes off once the queue has been spoken.
+        Returns the full reply (with any [END_INTERVIEW] marker), or None.
+        """
+        page, captions = self.page, self.captions
+        chunker = SentenceChunker()
+        started = time.time()
+        reply = ""
+        spoken = []
+        mic_on = False
+        try:
+            try:
+                while True:
+                    delta = yield next_delta()
+                    if delta is None:
+                        sentences = chunker.flush()
+                    else:
+                        reply += delta
+                        sentences = chunker.feed(delta)
+                    for sentence in sentences:
+                        sentence = sentence.replace("[END_INTERVIEW]", "").strip()
+                        if not sentence:
+                            continue
+                        audio = None
+                        if self.render:
+                            audio = yield self.render(sentence)
+                            if not audio:
+                                self.log(f"[ERROR] TTS render failed, not speaking: {sentence[:50]}")
+                                continue
+                        if not mic_on:
+                            yield from captions.check_resume(page)
+                            captions.set_agent_speaking(True)
+                            self.log("[MIC] Enabling microphone...")
+                            yield page.keyboard.press("Control+d")
+                            mic_on = True
+                            self.log(f"[TTS] First sentence after {time.time() - started:.1f}s")
+                        if audio:
+                            yield page.evaluate(SPEECH_AUDIO_ENQUEUE_SCRIPT, [audio, not spoken])
+                        else:
+                            yield page.evaluate(SPEECH_ENQUEUE_SCRIPT, [sentence, 0.9, not spoken])
+                        spoken.append(sentence)
+                    if delta is None:
+                        break
+            except Exception as e:
+                self.log(f"[ERROR] TTS error: {e}")
+
+            if spoken:
+                text = " ".join(spoken)
+                self.log(f"[AGENT] {text}")
+                # Generous upper bound in case onend never fires (~2.5 words/s at rate 0.9).
+                timeout_ms = int(max(10, len(text.split()) * 0.8 + 5) * 1000)
+                try:
+                    result = yield page.evaluate(SPEECH_DRAIN_SCRIPT, timeout_ms)
+                    self.log(f"[TTS] {result['outcome']} after {result['seconds']:.1f}s")
+                except Exception as e:
+                    self.log(f"[ERROR] TTS error: {e}")
+        except GeneratorExit:
+            # Closed by the driver (task cancelled): no more page steps can run.
+            captions.set_agent_speaking(False)
+            mic_on = False
+            raise
+        finally:
+            # Whatever failed above, never leave the mic open or the listener muted.
+            if mic_on:
+                self.log("[MIC] Disabling microphone...")
+                try:
+                    yield page.keyboard.press("Control+d")
+                finally:
+                    captions.set_agent_speaking(False)
+        return reply or None
+
+
+class InterviewAgent:
+    def __init__(self):
+        # Paths
+        self.schedule_file = os.path.join(os.getcwd(), "data", "final_interview_schedule.xlsx")
+        self.transcript_dir = os.path.join(os.getcwd(), "unverified_transcripts")
+        os.makedirs(self.transcript_dir, exist_ok=True)
+        
+        self.groq = GroqClient()
+        self.captions = CaptionsListener()  
+        self.processed_meetings = set()
+        self.prepare_minutes = float(os.getenv("INTERVIEW_PREWARM_MINUTES", "10"))
+        self.next_prepare_scan = 0
+        self.browser = BrowserPool(
+            os.path.join(os.getcwd(), "browser_profile"),
+            max_meetings=int(os.getenv("INTERVIEW_BROWSER_MAX_MEETINGS", "20")),
+            prepared_ttl=(self.prepare_minutes + 5) * 60
+        )
+        self.streaming = os.getenv("INTERVIEW_STREAMING", "true").lower() == "true"
+        
+        print("\n" + "="*60)
+        print("[START] INTERVIEW AGENT STARTED")
+        print("="*60)
+        print(f"[CONFIG] Schedule: {self.schedule_file}")
+        print(f"[CONFIG] Transcripts: {self.transcript_dir}")
+        print(f"[CONFIG] Schedule check: Every 1 minute")
+        print(f"[CONFIG] Join: 5 minutes before meeting (page pre-loaded {self.prepare_minutes:g} min before)")
+        print(f"[CONFIG] Interview starts: 1 min after meeting time")
+        print(f"[CONFIG] Using Google Meet Live Captions (no audio)")
+        print(f"[CONFIG] Replies: {'streamed sentence by sentence' if self.streaming else 'spoken after full completion'}")
+        print(f"[CONFIG] End of turn: {self.captions.endpointer.mode} ({self.captions.endpointer.min_silence}-{self.captions.silence_threshold}s silence)")
+        print("="*60 + "\n")
+    
+    def clean_caption_text(self, text):
+        """Clean Google Meet caption noise from text."""
+        noise_words = {
+            'language', 'English', 'format_size', 'Font size', 
+            'circle', 'Font color', 'settings', 'Open caption settings',
+            'Hindi', 'Spanish', 'French', 'German', 'You'
+        }
         
-        self.save_transcript(candidate_name, conversation)
-        print("\n[OK] Interview complete!\n")
+        lines = text.split('\n')
+        cleaned = []
+        for line in lines:
+            stripped = line.strip()
+            if stripped and stripped not in noise_words:
+                words = stripped.split()
+                if len(words) <= 2 and all(w[0].isupper() for w in words if w):
+                    continue
+                cleaned.append(stripped)
+        
+        return ' '.join(cleaned).strip()
+
+    def open_reply(self, messages):
+        """The LLM reply for Interview: streamed deltas, or the whole reply as one when not streaming."""
+        if self.streaming:
+            deltas = self.groq.chat_stream(messages)
+        else:
+            reply = self.groq.chat(messages)
+            deltas = iter([reply] if reply else [])
+        return lambda: next(deltas, None)
 
-    def save_transcript(self, candidate_name, conversation):
-        """Save conversation to file with email and role from current interview."""
+    def save_transcript(self, candidate_name, conversation, email=None, role=None):
+        """Save conversation to file with email and role (default: from the current interview)."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{candidate_name.replace(' ', '_')}_{timestamp}.txt"
         filepath = os.path.join(self.transcript_dir, filename)
         
-        email = getattr(self, 'current_email', 'Not provided')
-        role = getattr(self, 'current_role', 'Unknown')
+        email = email or getattr(self, 'current_email', 'Not provided')
+        role = role or getattr(self, 'current_role', 'Unknown')
         
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(f"Interview Transcript: {candidate_name}\n")
@@ -376,15 +984,20 @@ No markdown in responses."""
         print(f"[SAVED] Transcript: {filepath}")
         print(f"[INFO] Email saved: {email}")
 
-    def check_schedule(self):
-        """Check schedule and join if meeting is due."""
+    def scan_schedule(self):
+        """
+        Reads the interview schedule. Returns the meetings not yet processed as
+        dicts (candidate_name, email, role, scheduled_time, scheduled_time_str,
+        meeting_link, meeting_id, minutes_until).
+        """
         now = datetime.now()
         print(f"\n[CHECK] Schedule check at {now.strftime('%H:%M:%S')}")
         
         if not os.path.exists(self.schedule_file):
             print(f"[ERROR] Schedule file not found: {self.schedule_file}")
-            return
+            return []
         
+        meetings = []
         try:
             df = pd.read_excel(self.schedule_file)
             
@@ -394,6 +1007,10 @@ No markdown in responses."""
                 scheduled_time_str = str(row.get('Scheduled Time', ''))
                 meeting_link = str(row.get('Meeting Link', ''))
                 
+                meeting_id = f"{candidate_name}_{scheduled_time_str}"
+                if meeting_id in self.processed_meetings:
+                    continue
+                
                 candidate_email = str(row.get('Email', ''))
                 if not candidate_email or candidate_email == 'nan':
                     try:
@@ -406,10 +1023,6 @@ No markdown in responses."""
                     except:
                         candidate_email = 'Not provided'
                 
-                meeting_id = f"{candidate_name}_{scheduled_time_str}"
-                if meeting_id in self.processed_meetings:
-                    continue
-                
                 try:
                     scheduled_time = datetime.strptime(scheduled_time_str, "%d-%m-%Y %I:%M %p")
                 except:
@@ -419,138 +1032,119 @@ No markdown in responses."""
                         print(f"[WARN] Could not parse time: {scheduled_time_str}")
                         continue
                 
-                time_diff_minutes = (scheduled_time - now).total_seconds() / 60
-                
-                if 0 <= time_diff_minutes <= 5:
-                    print(f"\n[MEETING FOUND]")
-                    print(f"   Candidate: {candidate_name}")
-                    print(f"   Email: {candidate_email}")
-                    print(f"   Role: {role}")
-                    print(f"   Scheduled: {scheduled_time_str}")
-                    print(f"   Joining in: {time_diff_minutes:.1f} min")
-                    
-                    self.processed_meetings.add(meeting_id)
-                    self.join_meeting(meeting_link, candidate_name, candidate_email, role, scheduled_time)
-                    
+                meetings.append({
+                    "candidate_name": candidate_name,
+                    "email": candidate_email,
+                    "role": role,
+                    "scheduled_time": scheduled_time,
+                    "scheduled_time_str": scheduled_time_str,
+                    "meeting_link": meeting_link,
+                    "meeting_id": meeting_id,
+                    "minutes_until": (scheduled_time - now).total_seconds() / 60
+                })
         except Exception as e:
             print(f"[ERROR] Schedule error: {e}")
+        return meetings
+
+    def check_schedule(self):
+        """Check schedule and join if meeting is due."""
+        for meeting in self.scan_schedule():
+            time_diff_minutes = meeting["minutes_until"]
+            
+            if 5 < time_diff_minutes <= self.prepare_minutes:
+                self.browser.prepare(meeting["meeting_id"], meeting["meeting_link"])
+            
+            if 0 <= time_diff_minutes <= 5:
+                print(f"\n[MEETING FOUND]")
+                print(f"   Candidate: {meeting['candidate_name']}")
+                print(f"   Email: {meeting['email']}")
+                print(f"   Role: {meeting['role']}")
+                print(f"   Scheduled: {meeting['scheduled_time_str']}")
+                print(f"   Joining in: {time_diff_minutes:.1f} min")
+                
+                self.processed_meetings.add(meeting["meeting_id"])
+                self.join_meeting(
+                    meeting["meeting_link"], meeting["candidate_name"], meeting["email"],
+                    meeting["role"], meeting["scheduled_time"], meeting["meeting_id"]
+                )
+
+    def prepare_next_meeting(self, page):
+        """
+        The schedule loop is blocked for the whole interview, so the next
+        meeting's page is pre-loaded from between turns, at most once a minute.
+        It is only committed here and finishes loading in the background.
+        """
+        if time.time() < self.next_prepare_scan:
+            return
+        self.next_prepare_scan = time.time() + 60
+        prepared = False
+        for meeting in self.scan_schedule():
+            if 0 < meeting["minutes_until"] <= self.prepare_minutes and meeting["meeting_id"] not in self.browser.prepared:
+                self.browser.prepare(meeting["meeting_id"], meeting["meeting_link"], wait_until="commit")
+                prepared = True
+        if prepared:
+            try:
+                page.bring_to_front()  # keep the live meeting in the foreground tab
+            except Exception:
+                pass
 
-    def join_meeting(self, meeting_link, candidate_name, candidate_email, role, scheduled_time):
+    def join_meeting(self, meeting_link, candidate_name, candidate_email, role, scheduled_time, meeting_id=None):
         """Join meeting, wait until 1 min after scheduled time, then conduct interview."""
         print(f"\n[JOIN] Joining meeting for {candidate_name} ({candidate_email})...")
         
         self.current_email = candidate_email
         self.current_role = role
         
-        context = None
-        p = None
-        
-        profile_dir = os.path.join(os.getcwd(), "browser_profile")
+        page = None
         
         try:
-            p = sync_playwright().start()
-            
-            print(f"[INFO] Using persistent profile: {profile_dir}")
-            context = p.chromium.launch_persistent_context(
-                profile_dir,
-                headless=False,
-                args=[
-                    '--use-fake-ui-for-media-stream',
-                    '--disable-blink-features=AutomationControlled'
-                ],
-                permissions=['microphone', 'camera'],
-                accept_downloads=True
-            )
-            
-            page = context.pages[0] if context.pages else context.new_page()
-            
             print(f"[NAV] Opening: {meeting_link}")
-            page.goto(meeting_link)
-            time.sleep(5)
-            
-            if "accounts.google.com" in page.url:
-                print("\n" + "="*60)
-                print("[LOGIN REQUIRED]")
-                print("Please sign in to your Google account in the browser.")
-                print("Your login will be saved for future sessions.")
-                print("="*60 + "\n")
-                
-                for i in range(12):  # 12 x 5 = 60 seconds
-                    time.sleep(5)
-                    if "meet.google.com" in page.url:
-                        print("[OK] Login successful!")
-                        break
-                    print(f"[WAIT] Waiting for login... {(24-i)*5}s remaining")
-                else:
-                    print("[ERROR] Login timeout")
-                    return
-            
-            page.keyboard.press("Control+e") 
-            time.sleep(1)
-            page.keyboard.press("Control+d") 
-            time.sleep(1)
-            
-            try:
-                join_btn = page.locator("button:has-text('Join now'), button:has-text('Ask to join')").first
-                join_btn.click(timeout=10000)
-                print("[OK] Clicked join button")
-            except:
-                print("[WARN] Join button not found")
-            
-            time.sleep(3)
-            print("[OK] In meeting!")
-            
-            interview_start_time = scheduled_time + timedelta(minutes=1)
-            now = datetime.now()
-            wait_seconds = (interview_start_time - now).total_seconds()
-            
-            if wait_seconds > 0:
-                wait_minutes = wait_seconds / 60
-                print(f"\n[WAIT] Meeting scheduled: {scheduled_time.strftime('%H:%M')}")
-                print(f"       Interview starts: {interview_start_time.strftime('%H:%M')} (2 min after meeting)")
-                print(f"       Waiting {wait_minutes:.1f} minutes...")
-                
-                while datetime.now() < interview_start_time:
-                    remaining = (interview_start_time - datetime.now()).total_seconds()
-                    if remaining > 60:
-                        print(f"       {int(remaining/60)} minutes remaining...")
-                        time.sleep(60)
-                    else:
-                        print(f"       {int(remaining)} seconds remaining...")
-                        time.sleep(remaining)
-                        break
-            else:
-                print("[INFO] Already past interview start time, starting now...")
-            
-            print("\n[START] Starting interview...")
-            
-            self.conduct_interview(page, candidate_name, role)
-            
-            print("[LEAVE] Leaving meeting...")
-            page.keyboard.press("Control+h")
-            time.sleep(2)
+            page = self.browser.acquire(meeting_id or meeting_link, meeting_link)
+            interview = Interview(
+                page, self.captions, candidate_name, role, self.open_reply,
+                save=lambda conversation: self.save_transcript(candidate_name, conversation),
+                streaming=self.streaming,
+                clean=self.clean_caption_text,
+                login_wait=60,
+                between_turns=lambda: self.prepare_next_meeting(page)
+            )
+            run_steps(interview.run(scheduled_time), page)
             
         except Exception as e:
             print(f"[ERROR] Meeting error: {e}")
         finally:
-            if context:
-                context.close()
-            if p:
-                p.stop()
+            if page:
+                self.captions.detach(page)
+                self.browser.release(page)
 
     def run(self):
         """Main loop - checks schedule every 1 minute."""
         print("[RUN] Agent running. Press Ctrl+C to stop.\n")
         
+        self.browser.health_check()  # launch now so the first meeting joins warm
         self.check_schedule()
         schedule.every(1).minutes.do(self.check_schedule)
+        schedule.every(1).minutes.do(self.browser.health_check)
         
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        try:
+            while True:
+                schedule.run_pending()
+                time.sleep(1)
+        finally:
+            print(f"[BROWSER] {self.browser.stats}")
+            self.browser.close()
 
 
 if __name__ == "__main__":
     agent = InterviewAgent()
-    agent.run()
+    if int(os.getenv("INTERVIEW_MAX_CONCURRENT", "1")) > 1:
+        # Several interviews at once on async Playwright (see interview_runtime.py)
+        import asyncio
+        try:
+            from interview_runtime import InterviewRuntime
+        except ImportError:
+            from agents.interview_runtime import InterviewRuntime
+        asyncio.run(InterviewRuntime(agent).run())
+    else:
+        agent.run()
 
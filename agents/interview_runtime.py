@@ -0,0 +1,343 @@
+"""
+Interview Runtime (async)
+-------------------------
+Runs several Google Meet interviews at once on playwright.async_api. The
+sync InterviewAgent blocks on one meeting for up to 40 minutes, so any
+meeting due in that window was missed.
+
+- each interview gets its own Chromium, launched on its own audio route,
+  with a fresh browser context seeded with the Google session exported from
+  the agent's persistent (logged-in) profile
+- each interview has its own page, caption listener, endpointer and
+  conversation
+- at most INTERVIEW_MAX_CONCURRENT interviews run at once; a meeting that
+  comes due while every slot is busy waits for the next free one, and is
+  skipped if it started more than INTERVIEW_MAX_LATE_MINUTES ago by then
+- replies stream from the LLM (AsyncOpenAI) and are spoken sentence by sentence
+
+Speech is played by the page and reaches the meeting through the
+microphone, so interviews sharing one browser or one audio device hear, and
+cancel, each other's speech. INTERVIEW_AUDIO_ROUTES lists one PulseAudio
+sink per concurrent interview: its browser plays into the sink and its Meet
+microphone reads the sink's monitor. On a route each sentence is rendered
+to audio (tts_cache.TTSCache) and played by the page itself, because
+speechSynthesis is played by the OS speech daemon on the default sink, not
+by the browser. Routes need Linux with PulseAudio (or PipeWire's pulse
+server); the runtime checks they exist with pactl, and refuses to start with
+INTERVIEW_MAX_CONCURRENT > 1 and fewer routes than that.
+
+The join sequence, conversation loop, speech and caption listening are the
+page-step generators of interview_agent.Interview, run here by
+run_steps_async; interview_agent.py starts this runtime when
+INTERVIEW_MAX_CONCURRENT > 1.
+"""
+
+import os
+import sys
+import base64
+import asyncio
+import inspect
+import subprocess
+import traceback
+from datetime import datetime
+from openai import AsyncOpenAI
+from playwright.async_api import async_playwright
+
+try:
+    from interview_agent import (
+        InterviewAgent, CaptionsListener, Interview, Pause, CAPTION_SELECTORS, CAPTION_READ_SCRIPT
+    )
+    from browser_pool import BrowserPool
+    from tts_cache import TTSCache
+except ImportError:
+    from agents.interview_agent import (
+        InterviewAgent, CaptionsListener, Interview, Pause, CAPTION_SELECTORS, CAPTION_READ_SCRIPT
+    )
+    from agents.browser_pool import BrowserPool
+    from agents.tts_cache import TTSCache
+
+
+def parse_audio_routes(value):
+    """'agent1,agent2' -> ['agent1', 'agent2']: one PulseAudio sink per concurrent interview."""
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def check_audio_routes(routes):
+    """Raises RuntimeError unless every route is an existing PulseAudio sink."""
+    try:
+        listing = subprocess.run(
+            ["pactl", "list", "short", "sinks"], capture_output=True, text=True, timeout=10, check=True
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        raise RuntimeError(f"INTERVIEW_AUDIO_ROUTES needs PulseAudio (pactl): {e}")
+    sinks = {line.split("\t")[1] for line in listing.splitlines() if "\t" in line}
+    missing = [route for route in routes if route not in sinks]
+    if missing:
+        raise RuntimeError(
+            f"PulseAudio sinks not found: {', '.join(missing)} "
+            f"(create them with: pactl load-module module-null-sink sink_name=<name>)"
+        )
+
+
+async def run_steps_async(steps, changed=None):
+    """
+    Runs an Interview page-step generator on the async Playwright API:
+    awaitables (Playwright calls, LLM deltas, transcript saves) are awaited
+    and their result or exception is sent back into the generator. A Pause
+    with wake_on_caption ends early when `changed` is set.
+    """
+    result, error = None, None
+    while True:
+        try:
+            step = steps.throw(error) if error is not None else steps.send(result)
+        except StopIteration as done:
+            return done.value
+        result, error = None, None
+        try:
+            if isinstance(step, Pause):
+                if step.wake_on_caption and changed is not None:
+                    changed.clear()
+                    try:
+                        await asyncio.wait_for(changed.wait(), step.seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await asyncio.sleep(step.seconds)
+            elif inspect.isawaitable(step):
+                result = await step
+            else:
+                result = step
+        except Exception as e:
+            error = e
+
+
+class AsyncCaptionsListener(CaptionsListener):
+    """CaptionsListener for one async interview page: wakes the listener on each caption change."""
+
+    def __init__(self, name):
+        super().__init__(prefix=f"[{name}] ")
+        self.changed = asyncio.Event()
+        self.poller = None
+
+    def attach(self, page):
+        """Injects the caption observer, or starts a DOM poller that feeds on_caption the same way."""
+        if not (yield from super().attach(page)):
+            self.poller = asyncio.create_task(self.poll(page))
+            self.attached_pages.add(id(page))
+        return True
+
+    async def poll(self, page):
+        last = None
+        while True:
+            try:
+                text = await page.evaluate(CAPTION_READ_SCRIPT, CAPTION_SELECTORS)
+            except Exception:
+                text = last
+            if text != last:
+                last = text
+                self.on_caption(None, text)
+            await asyncio.sleep(0.1)
+
+    def detach(self, page):
+        if self.poller:
+            self.poller.cancel()
+            self.poller = None
+        super().detach(page)
+
+    def on_caption(self, source, text):
+        super().on_caption(source, text)
+        self.changed.set()
+
+
+class InterviewSession:
+    """One interview: its own page, caption listener and conversation."""
+
+    def __init__(self, runtime, meeting, route=None):
+        self.runtime = runtime
+        self.meeting = meeting
+        self.route = route
+        self.name = meeting["candidate_name"]
+        self.captions = AsyncCaptionsListener(self.name)
+
+    def log(self, message):
+        print(f"[{self.name}] {message}")
+
+    def open_reply(self, messages):
+        """The next-delta callable Interview expects, over the runtime's async LLM stream."""
+        stream = self.runtime.stream_reply(messages)
+
+        async def next_delta():
+            try:
+                return await stream.__anext__()
+            except StopAsyncIteration:
+                return None
+        return next_delta
+
+    def save(self, conversation):
+        return asyncio.to_thread(
+            self.runtime.agent.save_transcript, self.name, conversation, self.meeting["email"], self.meeting["role"]
+        )
+
+    async def run(self, context):
+        """Opens the meeting in `context`, then joins and conducts the interview."""
+        page = await context.new_page()
+        try:
+            self.log(f"[NAV] Opening: {self.meeting['meeting_link']}")
+            await page.goto(self.meeting["meeting_link"], wait_until="domcontentloaded")
+            interview = Interview(
+                page, self.captions, self.name, self.meeting["role"], self.open_reply, self.save,
+                streaming=self.runtime.agent.streaming,
+                clean=self.runtime.agent.clean_caption_text,
+                render=self.runtime.render_speech if self.route else None,
+                log=self.log
+            )
+            await run_steps_async(interview.run(self.meeting["scheduled_time"]), self.captions.changed)
+        except Exception as e:
+            self.log(f"[ERROR] Meeting error: {e}")
+        finally:
+            self.captions.detach(page)
+
+
+class InterviewRuntime:
+    def __init__(self, agent=None, max_concurrent=None, audio_routes=None):
+        self.agent = agent or InterviewAgent()
+        self.max_concurrent = max_concurrent or int(os.getenv("INTERVIEW_MAX_CONCURRENT", "1"))
+        self.audio_routes = audio_routes if audio_routes is not None else parse_audio_routes(os.getenv("INTERVIEW_AUDIO_ROUTES", ""))
+        if self.max_concurrent > 1 and len(self.audio_routes) < self.max_concurrent:
+            raise ValueError(
+                f"INTERVIEW_MAX_CONCURRENT={self.max_concurrent} needs {self.max_concurrent} INTERVIEW_AUDIO_ROUTES "
+                f"(got {len(self.audio_routes)}): interviews sharing an audio path hear and cut off each other's speech"
+            )
+        if self.audio_routes and not sys.platform.startswith("linux"):
+            raise ValueError("INTERVIEW_AUDIO_ROUTES needs Linux with PulseAudio; use INTERVIEW_MAX_CONCURRENT=1 elsewhere")
+        self.tts = None
+        if self.audio_routes:
+            self.tts = TTSCache(
+                os.getenv("INTERVIEW_TTS_CACHE_DIR", os.path.join(os.getcwd(), "data", "interview_tts_cache")),
+                engine=os.getenv("INTERVIEW_TTS_ENGINE", "gtts"),
+                lang=os.getenv("INTERVIEW_TTS_LANG", "en"),
+            )
+            if not self.tts.enabled:
+                raise ValueError("INTERVIEW_AUDIO_ROUTES needs INTERVIEW_TTS_ENGINE=gtts or pyttsx3")
+        self.tts_wait = float(os.getenv("INTERVIEW_TTS_RENDER_WAIT", "15"))
+        self.max_late_minutes = float(os.getenv("INTERVIEW_MAX_LATE_MINUTES", "10"))
+        self.client = AsyncOpenAI(api_key=self.agent.groq.api_key, base_url=self.agent.groq.api_url, timeout=30, max_retries=1)
+        self.model = self.agent.groq.model
+        self.storage_state = os.getenv(
+            "INTERVIEW_STORAGE_STATE", os.path.join(os.getcwd(), "data", "interview_session.json")
+        )
+        self.playwright = None
+        self.browsers = []              # one per interview slot, each on its own audio route
+        self.free_browsers = asyncio.Queue()   # (browser, route)
+        self.tasks = {}
+
+    async def stream_reply(self, messages):
+        """Yields the LLM reply in pieces as tokens arrive."""
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=200,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            print(f"[ERROR] Groq API streaming error: {e}")
+
+    async def render_speech(self, text):
+        """Renders `text` with the TTS cache and returns it as a data: URL for the page, or None."""
+        url = await self.tts.url_for(text, wait=self.tts_wait)
+        if not url:
+            return None
+        path = os.path.join(self.tts.directory, url.rsplit("/", 1)[-1])
+        try:
+            data = await asyncio.to_thread(lambda: open(path, "rb").read())
+        except OSError:
+            return None
+        mime = "audio/wav" if path.endswith(".wav") else "audio/mpeg"
+        return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+    async def start(self):
+        """Exports the logged-in profile's session and launches one browser per interview slot."""
+        if self.audio_routes:
+            await asyncio.to_thread(check_audio_routes, self.audio_routes[:self.max_concurrent])
+        self.playwright = await async_playwright().start()
+        os.makedirs(os.path.dirname(os.path.abspath(self.storage_state)), exist_ok=True)
+        profile = await self.playwright.chromium.launch_persistent_context(
+            self.agent.browser.profile_dir, headless=True, args=BrowserPool.LAUNCH_ARGS
+        )
+        try:
+            await profile.storage_state(path=self.storage_state)
+        finally:
+            await profile.close()
+
+        for route in self.audio_routes[:self.max_concurrent] or [None]:
+            env = None
+            if route:
+                env = {**os.environ, "PULSE_SINK": route, "PULSE_SOURCE": f"{route}.monitor"}
+            browser = await self.playwright.chromium.launch(headless=False, args=BrowserPool.LAUNCH_ARGS, env=env)
+            self.browsers.append(browser)
+            self.free_browsers.put_nowait((browser, route))
+            print(f"[BROWSER] Ready on audio route: {route or 'default device'}")
+        print(f"[BROWSER] Up to {self.max_concurrent} concurrent interviews (session: {self.storage_state})")
+
+    async def run_meeting(self, meeting):
+        if self.free_browsers.empty():
+            print(f"[{meeting['candidate_name']}] [WAIT] All {self.max_concurrent} interview slots busy, waiting for one to free up...")
+        browser, route = await self.free_browsers.get()
+        session = InterviewSession(self, meeting, route)
+        try:
+            late_minutes = (datetime.now() - meeting["scheduled_time"]).total_seconds() / 60
+            if late_minutes > self.max_late_minutes:
+                session.log(f"[SKIP] Slot freed {late_minutes:.0f} min after the meeting started, not joining")
+                return
+            context = await browser.new_context(
+                storage_state=self.storage_state, permissions=['microphone', 'camera']
+            )
+            try:
+                await session.run(context)
+            finally:
+                await context.close()
+        finally:
+            self.free_browsers.put_nowait((browser, route))
+
+    def meeting_done(self, meeting_id, task):
+        """Task done callback: forgets the meeting and logs a crash instead of dropping it silently."""
+        self.tasks.pop(meeting_id, None)
+        if task.cancelled() or task.exception() is None:
+            return
+        error = task.exception()
+        print(f"[ERROR] Interview task for {meeting_id} failed: {error}")
+        traceback.print_exception(type(error), error, error.__traceback__)
+
+    async def run(self):
+        """Checks the schedule every minute and starts each due interview as its own task."""
+        await self.start()
+        print("[RUN] Agent running (async, concurrent interviews). Press Ctrl+C to stop.\n")
+        try:
+            while True:
+                for meeting in await asyncio.to_thread(self.agent.scan_schedule):
+                    if 0 <= meeting["minutes_until"] <= 5:
+                        meeting_id = meeting["meeting_id"]
+                        self.agent.processed_meetings.add(meeting_id)
+                        print(f"\n[MEETING FOUND] {meeting['candidate_name']} ({meeting['email']}), "
+                              f"{meeting['role']}, at {meeting['scheduled_time_str']} "
+                              f"({len(self.tasks) + 1} active)")
+                        task = asyncio.create_task(self.run_meeting(meeting))
+                        self.tasks[meeting_id] = task
+                        task.add_done_callback(lambda t, key=meeting_id: self.meeting_done(key, t))
+                await asyncio.sleep(60)
+        finally:
+            for task in list(self.tasks.values()):
+                task.cancel()
+            await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+            for browser in self.browsers:
+                await browser.close()
+            await self.playwright.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(InterviewRuntime().run())
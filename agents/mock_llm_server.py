@@ -0,0 +1,134 @@
+"""
+Mock LLM Server
+---------------
+OpenAI-compatible /chat/completions endpoint with configurable latency, for
+benchmarking the voice server without spending Groq quota.
+
+Supports both regular and streamed (stream=true, SSE) completions.
+
+Run:
+    python agents/mock_llm_server.py --port 8099 --latency-ms 600
+
+Then:
+    GROQ_API_URL=http://localhost:8099/v1 GROQ_API_KEY=mock python agents/voice_server.py
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import threading
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Mock LLM")
+
+CONFIG = {
+    "latency_ms": float(os.getenv("MOCK_LLM_LATENCY_MS", "500")),
+    "jitter_ms": float(os.getenv("MOCK_LLM_JITTER_MS", "0")),
+    "token_ms": float(os.getenv("MOCK_LLM_TOKEN_MS", "15")),
+}
+
+REPLIES = [
+    "Congratulations on being shortlisted! The role involves building backend services with Python.",
+    "We can offer 10 LPA with stock options and great growth. Would that work for you?",
+    "That sounds good. When are you available for a technical interview?",
+    "Perfect, I have noted Monday at 10 AM for your technical interview.",
+    "Thank you for your time. Have a great day! Goodbye.",
+]
+
+stats = {"requests": 0, "in_flight": 0, "peak_in_flight": 0}
+
+
+def pick_reply(messages):
+    """Returns a scripted reply based on how far into the conversation we are."""
+    user_turns = sum(1 for m in messages if m.get("role") == "user")
+    last = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    if "bye" in last.lower():
+        return REPLIES[-1]
+    return REPLIES[min(user_turns, len(REPLIES) - 1)]
+
+
+def completion_body(model, text):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": len(text.split()), "total_tokens": len(text.split())},
+    }
+
+
+async def stream_chunks(model, text):
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        delta = {"content": word if i == 0 else f" {word}"}
+        if i == 0:
+            delta["role"] = "assistant"
+        chunk = {
+            "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(CONFIG["token_ms"] / 1000.0)
+    final = {
+        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+    }
+    yield f"data: {json.dumps(final)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+@app.post("/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    stats["in_flight"] += 1
+    stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+    try:
+        await asyncio.sleep((CONFIG["latency_ms"] + random.uniform(0, CONFIG["jitter_ms"])) / 1000.0)
+        text = pick_reply(body.get("messages", []))
+        model = body.get("model", "mock")
+        if body.get("stream"):
+            return StreamingResponse(stream_chunks(model, text), media_type="text/event-stream")
+        return JSONResponse(completion_body(model, text))
+    finally:
+        stats["in_flight"] -= 1
+
+
+@app.get("/_stats")
+async def get_stats():
+    return {"stats": stats, "config": CONFIG}
+
+
+def run_in_thread(port, host="127.0.0.1"):
+    """Starts the mock server on a background thread; returns once it is accepting requests."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=CONFIG["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=CONFIG["jitter_ms"])
+    parser.add_argument("--token-ms", type=float, default=CONFIG["token_ms"])
+    args = parser.parse_args()
+
+    CONFIG.update({"latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "token_ms": args.token_ms})
+    print(f"[MOCK LLM] http://localhost:{args.port}/v1 | latency {args.latency_ms}ms")
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,27 @@
+"""
+Rate Limiter
+------------
+Thread-safe request pacing shared by the agents that fan work out over a
+thread pool (Calendar API writes, Twilio call creation).
+"""
+
+import time
+import threading
+
+
+class RateLimiter:
+    """Thread-safe pacing to at most `rate` calls per second (0 = unlimited)."""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
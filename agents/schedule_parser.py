@@ -0,0 +1,343 @@
+"""
+Schedule Parser
+---------------
+Deterministic extraction of the agreed interview slot from a voice-call
+transcript. Handles relative weekdays ("Monday", "next Friday"), "today",
+"tomorrow", ordinal dates ("26th January") and 12/24-hour times, resolved
+against the transcript's "Date:" header.
+
+The parser reports a confidence score so the Scheduler Agent can fall back
+to the LLM for anything it is not sure about. A slot only scores high when
+the candidate (USER) proposed it or agreed to it; an assistant proposal the
+candidate declined or never answered falls below the default threshold.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+OUTPUT_FORMAT = "%d-%m-%Y %I:%M %p"
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+
+NEGATIONS = {"not", "can't", "cannot", "can not", "won't", "don't", "isn't", "busy", "unavailable", "doesn't"}
+REFUSALS = NEGATIONS | {"no", "nope", "sorry", "get back", "let me check", "reschedule"}
+AFFIRMATIONS = {"yes", "yeah", "yep", "sure", "okay", "ok", "fine", "works", "perfect", "great", "sounds good", "confirmed"}
+
+# Speaker labels of the candidate's turns (transcript_writer writes USER for the caller)
+CANDIDATE_SPEAKERS = {"USER", "CANDIDATE"}
+
+_MONTH_RE = "|".join(sorted(MONTHS, key=len, reverse=True))
+_HOUR_RE = r"(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")"
+
+DAY_MONTH_RE = re.compile(
+    rf"\b(\d{{1,2}})(?:st|nd|rd|th)?(?:\s+of)?\s+({_MONTH_RE})\.?(?:,?\s+(\d{{4}}))?\b", re.I)
+MONTH_DAY_RE = re.compile(
+    rf"\b({_MONTH_RE})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s+(\d{{4}}))?", re.I)
+NUMERIC_DATE_RE = re.compile(r"\b(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})\b")
+ORDINAL_ONLY_RE = re.compile(r"\bthe\s+(\d{1,2})(?:st|nd|rd|th)\b", re.I)
+WEEKDAY_RE = re.compile(r"\b(?:(next|this|coming)\s+)?(" + "|".join(WEEKDAYS) + r")\b", re.I)
+RELATIVE_DAY_RE = re.compile(r"\b(day after tomorrow|tomorrow|today)\b", re.I)
+
+TIME_12H_RE = re.compile(
+    rf"\b{_HOUR_RE}(?:[:.](\d{{2}}))?\s*(a\.?\s?m\.?|p\.?\s?m\.?)(?![a-z])", re.I)
+TIME_PERIOD_RE = re.compile(
+    rf"\b{_HOUR_RE}(?:[:.](\d{{2}}))?\s*(?:o'?clock\s+)?in the (morning|afternoon|evening)\b", re.I)
+TIME_24H_RE = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b(?!\s*(?:a\.?\s?m|p\.?\s?m))", re.I)
+NOON_RE = re.compile(r"\b(noon|midday)\b", re.I)
+
+SALARY_RE = re.compile(r"\b(\d+(?:\.\d+)?)\s*(lpa|l\.p\.a\.?|lakhs?(?:\s+per\s+annum)?)\b", re.I)
+
+
+class ScheduleParser:
+    """Rule-based slot extractor for call transcripts."""
+
+    def __init__(self):
+        self.confidence_same_turn = 0.9
+        self.confidence_split_turns = 0.75
+        self.confirmation_bonus = 0.05
+        self.confidence_unconfirmed = 0.5
+        self.confidence_refused = 0.3
+
+    # ------------------------------------------------------------------ #
+    # Transcript structure
+    # ------------------------------------------------------------------ #
+    def split_transcript(self, transcript_text):
+        """Splits a transcript into header fields and (speaker, text) turns."""
+        header = {}
+        turns = []
+        in_body = False
+
+        for line in transcript_text.splitlines():
+            stripped = line.strip()
+            if not in_body:
+                if stripped.startswith("---"):
+                    in_body = True
+                    continue
+                if ":" in stripped:
+                    key, value = stripped.split(":", 1)
+                    header[key.strip().lower()] = value.strip()
+                continue
+
+            if not stripped:
+                continue
+            if ":" in stripped:
+                speaker, text = stripped.split(":", 1)
+                if speaker.isupper():
+                    turns.append((speaker, text.strip()))
+                    continue
+            if turns:
+                turns[-1] = (turns[-1][0], f"{turns[-1][1]} {stripped}")
+
+        return header, turns
+
+    def parse_anchor(self, header):
+        """Parses the 'Date:' header written by voice_server.save_transcript."""
+        raw = header.get("date", "")
+        for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(raw, fmt)
+            except ValueError:
+                continue
+        return None
+
+    # ------------------------------------------------------------------ #
+    # Date / time resolution
+    # ------------------------------------------------------------------ #
+    def _resolve_day_month(self, day, month, year, anchor):
+        """Builds a date from day/month, rolling to next year if already past."""
+        explicit_year = year is not None
+        year = int(year) if year else anchor.year
+        try:
+            value = datetime(year, month, day).date()
+        except ValueError:
+            return None
+        if not explicit_year and value < anchor.date():
+            try:
+                value = value.replace(year=year + 1)
+            except ValueError:
+                return None
+        return value
+
+    def find_dates(self, text, anchor):
+        """Returns (date, kind) tuples for every date mention in a turn."""
+        dates = []
+        explicit_spans = []
+
+        for match in DAY_MONTH_RE.finditer(text):
+            value = self._resolve_day_month(int(match.group(1)), MONTHS[match.group(2).lower()], match.group(3), anchor)
+            if value:
+                dates.append((value, "explicit"))
+                explicit_spans.append(match.span())
+
+        for match in MONTH_DAY_RE.finditer(text):
+            if any(s <= match.start() < e for s, e in explicit_spans):
+                continue
+            value = self._resolve_day_month(int(match.group(2)), MONTHS[match.group(1).lower()], match.group(3), anchor)
+            if value:
+                dates.append((value, "explicit"))
+                explicit_spans.append(match.span())
+
+        for match in NUMERIC_DATE_RE.finditer(text):
+            value = self._resolve_day_month(int(match.group(1)), int(match.group(2)), match.group(3), anchor)
+            if value:
+                dates.append((value, "explicit"))
+                explicit_spans.append(match.span())
+
+        if not explicit_spans:
+            for match in ORDINAL_ONLY_RE.finditer(text):
+                day = int(match.group(1))
+                month, year = anchor.month, anchor.year
+                try:
+                    value = datetime(year, month, day).date()
+                except ValueError:
+                    continue
+                if value < anchor.date():
+                    month = month % 12 + 1
+                    year = year + 1 if month == 1 else year
+                    try:
+                        value = datetime(year, month, day).date()
+                    except ValueError:
+                        continue
+                dates.append((value, "ordinal"))
+
+        for match in RELATIVE_DAY_RE.finditer(text):
+            offset = {"today": 0, "tomorrow": 1, "day after tomorrow": 2}[match.group(1).lower()]
+            dates.append(((anchor + timedelta(days=offset)).date(), "relative"))
+
+        for match in WEEKDAY_RE.finditer(text):
+            target = WEEKDAYS.index(match.group(2).lower())
+            days_ahead = (target - anchor.weekday()) % 7 or 7
+            dates.append(((anchor + timedelta(days=days_ahead)).date(), "weekday"))
+
+        return dates
+
+    def _to_24h(self, hour, minute, meridiem):
+        if hour < 1 or hour > 12 or minute > 59:
+            return None
+        if meridiem == "am":
+            hour = 0 if hour == 12 else hour
+        else:
+            hour = hour if hour == 12 else hour + 12
+        return hour, minute
+
+    def find_times(self, text):
+        """Returns (hour, minute) tuples for every time mention in a turn."""
+        times = []
+        taken = []
+
+        def hour_value(raw):
+            return NUMBER_WORDS[raw.lower()] if raw.lower() in NUMBER_WORDS else int(raw)
+
+        for match in TIME_12H_RE.finditer(text):
+            meridiem = "am" if match.group(3).lower().startswith("a") else "pm"
+            value = self._to_24h(hour_value(match.group(1)), int(match.group(2) or 0), meridiem)
+            if value:
+                times.append(value)
+                taken.append(match.span())
+
+        for match in TIME_PERIOD_RE.finditer(text):
+            meridiem = "am" if match.group(3).lower() == "morning" else "pm"
+            value = self._to_24h(hour_value(match.group(1)), int(match.group(2) or 0), meridiem)
+            if value:
+                times.append(value)
+                taken.append(match.span())
+
+        for match in TIME_24H_RE.finditer(text):
+            if any(s <= match.start() < e for s, e in taken):
+                continue
+            times.append((int(match.group(1)), int(match.group(2))))
+
+        for _ in NOON_RE.finditer(text):
+            times.append((12, 0))
+
+        return times
+
+    def mentions(self, text, words):
+        lowered = text.lower()
+        return any(re.search(rf"\b{re.escape(w)}\b", lowered) for w in words)
+
+    def candidate_reply(self, turns, after):
+        """'refused', 'agreed' or None from the candidate's first turn after index `after`."""
+        for speaker, text in turns[after + 1:]:
+            if speaker not in CANDIDATE_SPEAKERS:
+                continue
+            if self.mentions(text, REFUSALS):
+                return "refused"
+            if self.mentions(text, AFFIRMATIONS):
+                return "agreed"
+            return None
+        return None
+
+    def find_salary(self, turns):
+        """Returns the last salary figure mentioned in the call, if any."""
+        salary = None
+        for _, text in turns:
+            for match in SALARY_RE.finditer(text):
+                salary = f"{match.group(1)} LPA"
+        return salary
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def parse(self, transcript_text):
+        """
+        Extracts the interview slot from a transcript.
+        Returns the same keys as the LLM extractor plus 'confidence' (0-1).
+        """
+        header, turns = self.split_transcript(transcript_text)
+        result = {
+            "scheduled": False,
+            "schedule_time": None,
+            "role": header.get("role"),
+            "final_salary": self.find_salary(turns),
+            "confidence": 0.0,
+        }
+
+        anchor = self.parse_anchor(header)
+        if not anchor:
+            return result
+
+        current_date = None
+        current_time = None
+        last_turn_had_both = False
+        last_turn_ambiguous = False
+        last_turn_negated = False
+        last_slot_turn = None
+        slots_seen = []
+        candidate_slots = set()
+
+        for index, (speaker, text) in enumerate(turns):
+            dates = self.find_dates(text, anchor)
+            times = self.find_times(text)
+            if not dates and not times:
+                continue
+
+            last_turn_negated = self.mentions(text, NEGATIONS)
+
+            distinct_dates = {d for d, _ in dates}
+            explicit = {d for d, kind in dates if kind == "explicit"}
+            if explicit:
+                distinct_dates = explicit
+            last_turn_ambiguous = len(distinct_dates) > 1 or len(set(times)) > 1
+
+            if distinct_dates:
+                current_date = sorted(distinct_dates)[0] if len(distinct_dates) > 1 else next(iter(distinct_dates))
+            if times:
+                current_time = times[-1]
+            last_turn_had_both = bool(distinct_dates) and bool(times)
+
+            if current_date and current_time:
+                slots_seen.append((current_date, current_time))
+                last_slot_turn = index
+                if speaker in CANDIDATE_SPEAKERS:
+                    candidate_slots.add((current_date, current_time))
+
+        if not (current_date and current_time):
+            return result
+
+        slot = datetime.combine(current_date, datetime.min.time()).replace(
+            hour=current_time[0], minute=current_time[1])
+
+        confidence = self.confidence_same_turn if last_turn_had_both else self.confidence_split_turns
+        if len(slots_seen) >= 2 and slots_seen[-1] == slots_seen[-2]:
+            confidence += self.confirmation_bonus
+        if last_turn_ambiguous:
+            confidence -= 0.2
+        if last_turn_negated:
+            confidence -= 0.3
+
+        # Only the candidate can agree to a slot: an assistant proposal they
+        # turned down, or never answered, is not a booking.
+        reply = self.candidate_reply(turns, last_slot_turn)
+        if reply == "refused":
+            confidence = min(confidence, self.confidence_refused)
+        elif reply != "agreed" and slots_seen[-1] not in candidate_slots:
+            confidence = min(confidence, self.confidence_unconfirmed)
+        if slot < anchor:
+            confidence = min(confidence, 0.3)
+
+        result["scheduled"] = True
+        result["schedule_time"] = slot.strftime(OUTPUT_FORMAT)
+        result["confidence"] = round(max(0.0, min(1.0, confidence)), 2)
+        return result
+
+
+if __name__ == "__main__":
+    import sys
+
+    parser = ScheduleParser()
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as f:
+            print(path, parser.parse(f.read()))
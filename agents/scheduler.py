@@ -5,6 +5,11 @@ from openai import OpenAI
 from dotenv import load_dotenv
 import glob
 
+try:
+    from schedule_parser import ScheduleParser
+except ImportError:
+    from agents.schedule_parser import ScheduleParser
+
 load_dotenv()
 
 class SchedulerAgent:
@@ -15,6 +20,8 @@ class SchedulerAgent:
         
         self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
 
+        self.parser = ScheduleParser()
+        self.parser_min_confidence = float(os.getenv("SCHEDULE_PARSER_MIN_CONFIDENCE", "0.8"))
         
         self.root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.data_path = os.path.join(self.root_dir, "data", "applications_data.xlsx")
@@ -41,6 +48,13 @@ class SchedulerAgent:
             return {}
 
     def extract_interview_details(self, transcript_text):
+        """Extracts schedule time and role, trying the rule-based parser before the LLM."""
+        parsed = self.parser.parse(transcript_text)
+        if parsed.get("scheduled") and parsed.get("confidence", 0) >= self.parser_min_confidence:
+            return parsed
+        return self.extract_with_llm(transcript_text)
+
+    def extract_with_llm(self, transcript_text):
         """Uses LLM to extract schedule time and role from transcript."""
         prompt = f"""
 You are an expert Data Extractor. Analyze the following interview transcript.
@@ -81,6 +95,34 @@ Return ONLY JSON:
             print(f"LLM Error: {e}")
             return {"scheduled": False}
 
+    def process_transcript_file(self, filepath, email_map=None):
+        """Extracts the interview slot from a single transcript. Returns a schedule row or None."""
+        if email_map is None:
+            email_map = self.load_candidate_data()
+
+        filename = os.path.basename(filepath)
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        candidate_name = "Unknown"
+        for line in content.splitlines():
+            if line.startswith("Candidate:"):
+                candidate_name = line.split(":", 1)[1].strip()
+                break
+
+        details = self.extract_interview_details(content)
+        if not details.get('scheduled'):
+            return None
+
+        return {
+            "Candidate Name": candidate_name,
+            "Email": email_map.get(candidate_name.lower(), "Email Not Found"),
+            "Role": details.get('role'),
+            "Scheduled Time": details.get('schedule_time'),
+            "Agreed Salary": details.get('final_salary'),
+            "Transcript File": filename
+        }
+
     def process_transcripts(self):
         print("--- Scheduler Agent ---")
         email_map = self.load_candidate_data()
@@ -95,30 +137,10 @@ Return ONLY JSON:
         scheduled_candidates = []
 
         for filepath in files:
-            filename = os.path.basename(filepath)
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-            
-            print(f"Processing {filename}...", end="\r")
-            candidate_name = "Unknown"
-            for line in content.splitlines():
-                if line.startswith("Candidate:"):
-                    candidate_name = line.split(":", 1)[1].strip()
-                    break
-            
-            details = self.extract_interview_details(content)
-            
-            if details.get('scheduled'):
-                email = email_map.get(candidate_name.lower(), "Email Not Found")
-                
-                scheduled_candidates.append({
-                    "Candidate Name": candidate_name,
-                    "Email": email,
-                    "Role": details.get('role'),
-                    "Scheduled Time": details.get('schedule_time'),
-                    "Agreed Salary": details.get('final_salary'),
-                    "Transcript File": filename
-                })
+            print(f"Processing {os.path.basename(filepath)}...", end="\r")
+            row = self.process_transcript_file(filepath, email_map)
+            if row:
+                scheduled_candidates.append(row)
         
         print(f"\nProcessing complete. Found {len(scheduled_candidates)} scheduled interviews.")
         
@@ -133,6 +155,22 @@ Return ONLY JSON:
         except Exception as e:
             print(f"Error saving schedule: {e}")
 
+    def upsert_schedule(self, row):
+        """Inserts a schedule row, replacing any earlier row for the same candidate."""
+        try:
+            if os.path.exists(self.output_file):
+                df = pd.read_excel(self.output_file)
+                if "Candidate Name" in df.columns:
+                    names = df["Candidate Name"].astype(str).str.strip().str.lower()
+                    df = df[names != str(row["Candidate Name"]).strip().lower()]
+                df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+            else:
+                df = pd.DataFrame([row])
+            df.to_excel(self.output_file, index=False)
+            print(f"Schedule updated for {row['Candidate Name']}: {row['Scheduled Time']}")
+        except Exception as e:
+            print(f"Error updating schedule: {e}")
+
 if __name__ == "__main__":
     agent = SchedulerAgent()
     agent.process_transcripts()
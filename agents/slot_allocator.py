@@ -0,0 +1,248 @@
+"""
+Slot Allocator
+--------------
+Conflict-aware interview slot allocation for the Calendar Agent.
+
+Busy intervals (calendar freeBusy blocks plus interviews already on the
+schedule) are loaded once into an augmented AVL interval tree, so each
+conflict check costs O(log n + k) for k overlapping intervals. Requested
+slots that collide are moved to the nearest free slot, and a batch of
+candidates is packed into the available interviewer capacity.
+"""
+
+from datetime import datetime, timedelta
+
+
+def subtract_intervals(blocks, cuts):
+    """Returns the parts of `blocks` not covered by any of `cuts` (all half-open (start, end) pairs)."""
+    cuts = sorted(cuts)
+    remaining = []
+    for start, end in blocks:
+        for cut_start, cut_end in cuts:
+            if cut_start >= end:
+                break
+            if cut_end <= start:
+                continue
+            if cut_start > start:
+                remaining.append((start, cut_start))
+            start = max(start, cut_end)
+            if start >= end:
+                break
+        if start < end:
+            remaining.append((start, end))
+    return remaining
+
+
+class _Node:
+    __slots__ = ("start", "end", "weight", "label", "max_end", "height", "left", "right")
+
+    def __init__(self, start, end, weight, label):
+        self.start = start
+        self.end = end
+        self.weight = weight
+        self.label = label
+        self.max_end = end
+        self.height = 1
+        self.left = None
+        self.right = None
+
+
+class IntervalTree:
+    """Self-balancing interval tree over half-open [start, end) intervals."""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    # --- balancing helpers ---
+    def _height(self, node):
+        return node.height if node else 0
+
+    def _update(self, node):
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        node.max_end = node.end
+        if node.left and node.left.max_end > node.max_end:
+            node.max_end = node.left.max_end
+        if node.right and node.right.max_end > node.max_end:
+            node.max_end = node.right.max_end
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+
+    def _rebalance(self, node):
+        self._update(node)
+        balance = self._height(node.left) - self._height(node.right)
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if (new.start, new.end) < (node.start, node.end):
+            node.left = self._insert(node.left, new)
+        else:
+            node.right = self._insert(node.right, new)
+        return self._rebalance(node)
+
+    # --- public API ---
+    def insert(self, start, end, weight=1, label=None):
+        """Adds a busy interval. `weight` is how much capacity it consumes."""
+        if end <= start:
+            return
+        self.root = self._insert(self.root, _Node(start, end, weight, label))
+        self.size += 1
+
+    def overlapping(self, start, end):
+        """Returns (start, end, weight, label) for every interval overlapping [start, end)."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            if node.max_end <= start:
+                continue
+            if node.left:
+                stack.append(node.left)
+            if node.start < end:
+                if node.end > start:
+                    found.append((node.start, node.end, node.weight, node.label))
+                if node.right:
+                    stack.append(node.right)
+        return found
+
+
+class SlotAllocator:
+    """Finds conflict-free interview slots given interviewer capacity."""
+
+    def __init__(self, duration_minutes=60, capacity=1, granularity_minutes=15,
+                 work_start_hour=9, work_end_hour=18, search_days=14):
+        self.duration = timedelta(minutes=duration_minutes)
+        self.capacity = max(1, int(capacity))
+        self.granularity = timedelta(minutes=granularity_minutes)
+        self.work_start_hour = work_start_hour
+        self.work_end_hour = work_end_hour
+        self.search_window = timedelta(days=search_days)
+        self.tree = IntervalTree()
+
+    def add_busy(self, start, end, label=None, blocking=True):
+        """
+        Adds a busy interval. Blocking intervals (e.g. freeBusy blocks) use the
+        whole capacity; non-blocking ones (existing interviews) use one seat.
+        """
+        self.tree.insert(start, end, self.capacity if blocking else 1, label)
+
+    def peak_load(self, start, end):
+        """Maximum concurrent capacity used at any instant within [start, end)."""
+        edges = []
+        for s, e, weight, _ in self.tree.overlapping(start, end):
+            edges.append((max(s, start), weight))
+            edges.append((min(e, end), -weight))
+        load = peak = 0
+        for _, delta in sorted(edges, key=lambda edge: (edge[0], edge[1])):
+            load += delta
+            peak = max(peak, load)
+        return peak
+
+    def is_free(self, start):
+        return self.peak_load(start, start + self.duration) < self.capacity
+
+    def _in_working_hours(self, start):
+        end = start + self.duration
+        day_start = start.replace(hour=self.work_start_hour, minute=0, second=0, microsecond=0)
+        day_end = start.replace(hour=self.work_end_hour, minute=0, second=0, microsecond=0)
+        return start.weekday() < 5 and day_start <= start and end <= day_end
+
+    def _round_up(self, moment):
+        base = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        steps = -(-(moment - base) // self.granularity)
+        return base + steps * self.granularity
+
+    def _round_down(self, moment):
+        base = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        return base + ((moment - base) // self.granularity) * self.granularity
+
+    def _blocking_intervals(self, start):
+        return self.tree.overlapping(start, start + self.duration)
+
+    def _search_forward(self, requested, limit):
+        slot = self._round_up(requested)
+        while slot <= limit:
+            if not self._in_working_hours(slot):
+                next_day = slot.replace(hour=self.work_start_hour, minute=0, second=0, microsecond=0)
+                if slot >= next_day:
+                    next_day += timedelta(days=1)
+                slot = next_day
+                continue
+            conflicts = self._blocking_intervals(slot)
+            if sum(weight for _, _, weight, _ in conflicts) < self.capacity or self.is_free(slot):
+                return slot
+            # Nothing can start before the earliest conflicting interval ends.
+            slot = self._round_up(max(slot + self.granularity, min(e for _, e, _, _ in conflicts)))
+        return None
+
+    def _search_backward(self, requested, limit):
+        slot = self._round_down(requested)
+        while slot >= limit:
+            if not self._in_working_hours(slot):
+                prev_day = slot.replace(hour=self.work_end_hour, minute=0, second=0, microsecond=0) - self.duration
+                if slot <= prev_day:
+                    prev_day -= timedelta(days=1)
+                slot = self._round_down(prev_day)
+                continue
+            conflicts = self._blocking_intervals(slot)
+            if sum(weight for _, _, weight, _ in conflicts) < self.capacity or self.is_free(slot):
+                return slot
+            # Nothing can end after the latest conflicting interval starts.
+            slot = self._round_down(min(slot - self.granularity, max(s for s, _, _, _ in conflicts) - self.duration))
+        return None
+
+    def nearest_free(self, requested, earliest=None):
+        """Returns the requested slot if free and in working hours, else the closest free slot (ties go later)."""
+        if self._in_working_hours(requested) and self.is_free(requested):
+            return requested
+
+        earliest = earliest or datetime.now()
+        later = self._search_forward(max(requested, earliest), requested + self.search_window)
+        earlier = self._search_backward(requested, max(earliest, requested - self.search_window))
+
+        if later and earlier:
+            return earlier if requested - earlier < later - requested else later
+        return later or earlier
+
+    def book(self, start, label=None):
+        self.tree.insert(start, start + self.duration, 1, label)
+
+    def allocate(self, requests, earliest=None):
+        """
+        Packs (key, requested_start) pairs into free capacity in order of
+        requested time. Returns {key: allocated_start or None}.
+        """
+        allocation = {}
+        for key, requested in sorted(requests, key=lambda item: item[1]):
+            slot = self.nearest_free(requested, earliest)
+            allocation[key] = slot
+            if slot:
+                self.book(slot, key)
+        return allocation
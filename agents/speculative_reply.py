@@ -0,0 +1,121 @@
+"""
+Speculative Replies
+-------------------
+Drafts the LLM reply from Twilio's partial speech results while the caller
+is still talking, so most of the LLM latency is off the critical path of
+the turn.
+
+Gather posts StableSpeechResult to partialResultCallback as recognition
+firms up. Once the stable text is long enough, a draft reply is generated
+from it (keyed by CallSid). Partial results keep growing, so a draft is
+only restarted when the stable text stops extending the drafted words or
+runs more than `max_tail` words past them. When the final SpeechResult
+arrives, the draft is reused if the final text is the drafted text plus a
+short tail (or matches it closely), and discarded otherwise.
+
+Drafts live in the worker process that received the partial results; if
+the final webhook lands on another worker it just generates normally.
+"""
+
+import re
+import time
+import asyncio
+from difflib import SequenceMatcher
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def normalize(text):
+    """Lower-cased words without punctuation, so 'Monday, 10 AM.' matches 'monday 10 am'."""
+    return WORD_RE.findall((text or "").lower())
+
+
+def similarity(a, b):
+    return SequenceMatcher(None, normalize(a), normalize(b)).ratio()
+
+
+def tail_words(drafted, text):
+    """Words `text` adds after the drafted words, or None if it does not start with them."""
+    drafted, words = normalize(drafted), normalize(text)
+    if words[:len(drafted)] != drafted:
+        return None
+    return len(words) - len(drafted)
+
+
+class SpeculativeReplies:
+    def __init__(self, generate, min_words=3, match=0.9, max_drafts=3, max_tail=3):
+        """
+        generate:   coroutine (messages) -> reply text
+        min_words:  stable words needed before the first draft
+        match:      similarity between drafted and final text needed to reuse a draft
+        max_drafts: drafts started per turn at most (each restart costs an LLM call)
+        max_tail:   words the final text may add after the drafted text and still reuse the draft
+        """
+        self.generate = generate
+        self.min_words = min_words
+        self.match = match
+        self.max_drafts = max_drafts
+        self.max_tail = max_tail
+        self.drafts = {}
+        self.stats = {"drafts": 0, "hits": 0, "misses": 0}
+
+    def observe(self, call_sid, turn, messages, stable_text):
+        """
+        Handles a partial result. `turn` identifies the conversation position
+        (history length) and `messages` is the prompt without the user turn.
+        """
+        words = normalize(stable_text)
+        if len(words) < self.min_words:
+            return
+
+        draft = self.drafts.get(call_sid)
+        if draft and draft["turn"] == turn:
+            if self.covers(draft["text"], stable_text) or draft["count"] >= self.max_drafts:
+                return
+            draft["task"].cancel()
+            count = draft["count"] + 1
+        else:
+            self.discard(call_sid)
+            count = 1
+
+        task = asyncio.create_task(self.generate(messages + [{"role": "user", "content": stable_text}]))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())  # never "exception was never retrieved"
+        self.drafts[call_sid] = {"turn": turn, "text": stable_text, "task": task, "count": count, "started": time.monotonic()}
+        self.stats["drafts"] += 1
+
+    async def take(self, call_sid, turn, final_text):
+        """Returns the drafted reply if it matches `final_text`, else None (the draft is discarded)."""
+        draft = self.drafts.pop(call_sid, None)
+        if draft is None:
+            return None
+        if draft["turn"] != turn or not self.covers(draft["text"], final_text):
+            draft["task"].cancel()
+            self.stats["misses"] += 1
+            return None
+        try:
+            reply = await draft["task"]
+        except Exception as e:
+            print(f"[SPECULATIVE] Draft failed on {call_sid}: {e!r}")
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return reply
+
+    def covers(self, drafted, text):
+        """True if a reply drafted from `drafted` still answers `text`."""
+        tail = tail_words(drafted, text)
+        if tail is not None and tail <= self.max_tail:
+            return True
+        return similarity(drafted, text) >= self.match
+
+    def discard(self, call_sid):
+        draft = self.drafts.pop(call_sid, None)
+        if draft:
+            draft["task"].cancel()
+
+    def discard_stale(self, max_age):
+        """Drops drafts whose final result never arrived (hang-ups, other workers)."""
+        now = time.monotonic()
+        for call_sid, draft in list(self.drafts.items()):
+            if now - draft["started"] > max_age:
+                self.discard(call_sid)
@@ -0,0 +1,157 @@
+"""
+Transcript Writer
+-----------------
+Incremental, off-event-loop transcript persistence for the voice server.
+
+Each call's file is written once with the header and then only appended
+to, so a call costs O(turns) bytes instead of O(turns^2). All disk I/O runs
+on a background task that hands work to a thread, and files are fsynced
+when the call ends. The output is byte-compatible with what
+SchedulerAgent reads:
+
+    Candidate: <name>
+    Role: <role>
+    Salary Range: <range>
+    Date: <call timestamp>
+    --------------------
+
+    ASSISTANT: ...
+    USER: ...
+"""
+
+import os
+import time
+import asyncio
+import datetime
+
+
+class TranscriptWriter:
+    """
+    Appends new conversation turns to per-call transcript files.
+    Write progress is kept in the call state ("transcript" key), so any
+    worker that holds the state can continue the same file.
+    """
+
+    def __init__(self, path_for):
+        self.path_for = path_for
+        self.queue = None
+        self.task = None
+        self.files = {}
+        self.touched = {}
+
+    def start(self):
+        """Starts the background writer on the running event loop."""
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+
+    # --- event-loop side: snapshot what needs writing, never touch disk ---
+    def _header(self, context):
+        return (
+            f"Candidate: {context.get('name', 'Unknown')}\n"
+            f"Role: {context.get('role')}\n"
+            f"Salary Range: {context.get('salary_range')}\n"
+            f"Date: {datetime.datetime.now()}\n"
+            + "-" * 20 + "\n\n"
+        )
+
+    def _lines(self, messages):
+        return "".join(f"{m['role'].upper()}: {m['content']}\n" for m in messages if m['role'] != 'system')
+
+    def save(self, call_sid, state):
+        """Queues the turns added since the last save and updates state['transcript']."""
+        history = state["history"]
+        progress = state.get("transcript")
+        if progress is None:
+            context = state.get("context", {})
+            progress = {"path": self.path_for(call_sid, context), "header": self._header(context), "written": 0, "last": None}
+            state["transcript"] = progress
+            job = ("rewrite", progress["path"], progress["header"] + self._lines(history))
+        else:
+            written = progress["written"]
+            rewritten = written > len(history) or (written and history[written - 1]["content"] != progress["last"])
+            if rewritten:
+                # Earlier turns were edited (e.g. truncated on barge-in): rare full rewrite.
+                job = ("rewrite", progress["path"], progress["header"] + self._lines(history))
+            else:
+                new_lines = self._lines(history[written:])
+                if not new_lines:
+                    progress["written"] = len(history)
+                    return
+                job = ("append", progress["path"], new_lines)
+
+        progress["written"] = len(history)
+        progress["last"] = history[-1]["content"] if history else None
+        self.touched[progress["path"]] = time.monotonic()
+        self._submit(job)
+
+    def close(self, state, on_closed=None):
+        """Flushes and fsyncs the call's transcript, then calls `on_closed()` on the event loop."""
+        progress = (state or {}).get("transcript")
+        if progress is None:
+            if on_closed:
+                on_closed()
+            return
+        self.touched.pop(progress["path"], None)
+        self._submit(("close", progress["path"], on_closed))
+
+    def close_idle(self, max_idle):
+        """Closes files of calls that have not been written to for `max_idle` seconds."""
+        now = time.monotonic()
+        for path, touched in list(self.touched.items()):
+            if now - touched > max_idle:
+                del self.touched[path]
+                self._submit(("close", path, None))
+
+    def _submit(self, job):
+        if self.queue is None:
+            # No writer task (e.g. imported outside uvicorn): write inline.
+            self._execute(job)
+            if job[0] == "close" and job[2]:
+                job[2]()
+            return
+        self.queue.put_nowait(job)
+
+    # --- writer side: runs jobs in order, disk I/O in a worker thread ---
+    async def _run(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await asyncio.to_thread(self._execute, job)
+                if job[0] == "close" and job[2]:
+                    job[2]()
+            except Exception as e:
+                print(f"[ERROR] Saving transcript: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def drain(self):
+        """Waits until every queued write has hit the disk."""
+        if self.queue is not None:
+            await self.queue.join()
+
+    def _execute(self, job):
+        kind, path = job[0], job[1]
+        if kind == "close":
+            handle = self.files.pop(path, None)
+            if handle:
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+                print(f"[TRANSCRIPT] Saved: {path}")
+            return
+
+        if kind == "rewrite":
+            old = self.files.pop(path, None)
+            if old:
+                old.close()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(job[2])
+
+        handle = self.files.get(path)
+        if handle is None:
+            handle = open(path, "a", encoding="utf-8")
+            self.files[path] = handle
+        if kind == "append":
+            handle.write(job[2])
+        handle.flush()
@@ -0,0 +1,132 @@
+"""
+TTS Audio Cache
+---------------
+Pre-synthesised audio for the voice server's fixed and templated prompts.
+
+Each prompt is rendered once (gTTS or pyttsx3) into a content-addressed file
+named after a hash of engine + language + text, served as a static asset, and
+played with <Play> instead of being synthesised live by <Say> on every call.
+The least recently played files are evicted once the cache exceeds
+`max_bytes`.
+"""
+
+import os
+import asyncio
+import hashlib
+import threading
+
+
+class TTSCache:
+    def __init__(self, directory, engine="gtts", lang="en", max_bytes=200 * 1024 * 1024, url_prefix="/tts"):
+        self.directory = directory
+        self.engine = engine
+        self.lang = lang
+        self.max_bytes = max_bytes
+        self.url_prefix = url_prefix.rstrip("/")
+        self.extension = ".wav" if engine == "pyttsx3" else ".mp3"
+        self.rendering = {}
+        self.engine_lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        # name -> size, for files already on disk
+        self.sizes = {
+            name: os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory) if name.endswith(self.extension)
+        }
+
+    @property
+    def enabled(self):
+        return self.engine in ("gtts", "pyttsx3")
+
+    def key(self, text):
+        digest = hashlib.sha256(f"{self.engine}|{self.lang}|{text}".encode("utf-8")).hexdigest()
+        return digest[:32] + self.extension
+
+    def cached_url(self, text):
+        """Returns the audio URL for `text` if it is already rendered, else None."""
+        name = self.key(text)
+        if name not in self.sizes:
+            return None
+        try:
+            os.utime(os.path.join(self.directory, name))  # mtime doubles as last-played time
+        except FileNotFoundError:
+            self.sizes.pop(name, None)
+            return None
+        return f"{self.url_prefix}/{name}"
+
+    async def url_for(self, text, wait=0.0):
+        """
+        Returns the audio URL for `text`, rendering it on a miss. Waits at most
+        `wait` seconds for a render; returns None if it is not ready by then
+        (the render carries on in the background for the next call).
+        """
+        if not self.enabled:
+            return None
+        url = self.cached_url(text)
+        if url:
+            return url
+
+        name = self.key(text)
+        task = self.rendering.get(name)
+        if task is None:
+            task = asyncio.create_task(self._render(text, name))
+            self.rendering[name] = task
+            task.add_done_callback(lambda _: self.rendering.pop(name, None))
+        if wait <= 0:
+            return None
+        try:
+            await asyncio.wait_for(asyncio.shield(task), wait)
+        except asyncio.TimeoutError:
+            return None
+        return self.cached_url(text)
+
+    async def warm(self, texts):
+        """Renders a set of fixed prompts ahead of the first call."""
+        for text in texts:
+            await self.url_for(text, wait=60)
+
+    async def _render(self, text, name):
+        try:
+            await asyncio.to_thread(self._synthesize, text, name)
+            self._evict()
+        except Exception as e:
+            print(f"[ERROR] TTS render ({self.engine}): {e}")
+
+    def _synthesize(self, text, name):
+        path = os.path.join(self.directory, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if self.engine == "pyttsx3":
+            import pyttsx3
+            with self.engine_lock:
+                engine = pyttsx3.init()
+                engine.save_to_file(text, tmp_path)
+                engine.runAndWait()
+                engine.stop()
+        else:
+            from gtts import gTTS
+            gTTS(text=text, lang=self.lang).save(tmp_path)
+        os.replace(tmp_path, path)
+        self.sizes[name] = os.path.getsize(path)
+        print(f"[TTS] Rendered {name} ({self.sizes[name]} bytes): {text[:50]}")
+
+    def _evict(self):
+        """Drops the least recently played files until the cache fits in max_bytes."""
+        total = sum(self.sizes.values())
+        if total <= self.max_bytes:
+            return
+        by_age = sorted(self.sizes, key=lambda n: self._mtime(n))
+        for name in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= self.sizes.pop(name)
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            print(f"[TTS] Evicted {name}")
+
+    def _mtime(self, name):
+        try:
+            return os.path.getmtime(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            return 0.0
@@ -0,0 +1,95 @@
+"""
+Voice Server Concurrency Benchmark
+----------------------------------
+Drives N simultaneous simulated calls through voice_server.py in-process
+against mock_llm_server.py, and reports how turn latency and throughput
+scale with concurrency. With a non-blocking LLM client, turn latency stays
+flat and throughput grows linearly with the number of calls.
+
+Run:
+    python agents/voice_benchmark.py --levels 1,5,10,20,40 --turns 3 --latency-ms 500
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+MOCK_PORT = 8099
+
+
+async def simulate_call(client, call_sid, turns, latencies):
+    await client.post(
+        "/voice?candidate_name=Bench%20Candidate&role=Python%20Dev&salary_range=10-12%20LPA",
+        data={"CallSid": call_sid}
+    )
+    for turn in range(turns):
+        started = time.perf_counter()
+        response = await client.post("/process_speech", data={"CallSid": call_sid, "SpeechResult": f"answer {turn}"})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_level(app, concurrency, turns):
+    import httpx
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://voice", timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(simulate_call(client, f"BENCH{concurrency}_{i}", turns, latencies) for i in range(concurrency)))
+        wall = time.perf_counter() - started
+    return wall, latencies
+
+
+async def run_levels(app, levels, turns):
+    """Runs every level on one event loop (the LLM client is bound to it)."""
+    async with app.router.lifespan_context(app):
+        return [(level, *await run_level(app, level, turns)) for level in levels]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voice server concurrency benchmark")
+    parser.add_argument("--levels", default="1,5,10,20,40")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    os.environ["GROQ_API_KEY"] = "mock"
+    os.environ["GROQ_API_URL"] = f"http://127.0.0.1:{MOCK_PORT}/v1"
+    os.environ["AUTO_SCHEDULE_ON_CALL_END"] = "false"
+    os.environ["VOICE_TTS_ENGINE"] = "off"
+    os.environ["VOICE_TRANSCRIPT_DIR"] = tempfile.mkdtemp(prefix="voice_bench_")
+
+    import mock_llm_server
+    mock_llm_server.CONFIG["latency_ms"] = args.latency_ms
+    mock_llm_server.run_in_thread(MOCK_PORT)
+
+    import voice_server
+
+    print("\n" + "=" * 72)
+    print(f"{'calls':>6} {'turns':>6} {'wall s':>8} {'turns/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'scaling':>8}")
+    print("=" * 72)
+
+    levels = [int(x) for x in args.levels.split(",")]
+    baseline = None
+    for level, wall, latencies in asyncio.run(run_levels(voice_server.app, levels, args.turns)):
+        throughput = len(latencies) / wall
+        baseline = baseline or throughput
+        ordered = sorted(latencies)
+        p50 = statistics.median(ordered) * 1000
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+        scaling = throughput / (baseline * level)
+        print(f"{level:>6} {len(latencies):>6} {wall:>8.2f} {throughput:>8.1f} {p50:>8.0f} {p95:>8.0f} {scaling:>7.0%}")
+
+    print("=" * 72)
+    print("scaling = throughput / (single-call throughput x calls); ~100% means linear.")
+
+
+if __name__ == "__main__":
+    main()
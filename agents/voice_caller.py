@@ -1,10 +1,104 @@
 import os
+import time
+import threading
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from twilio.rest import Client
 from dotenv import load_dotenv
 
+try:
+    from rate_limiter import RateLimiter
+except ImportError:
+    from agents.rate_limiter import RateLimiter
+
 load_dotenv()
 
+E164_RE = r"^\+[1-9]\d{7,14}$"
+
+
+def normalize_phone_numbers(numbers, country_code="91", national_length=10):
+    """
+    Vectorised E.164 normalisation of a Series of phone numbers.
+    Returns (normalized, reason): normalized is '+<digits>' or None, reason
+    explains why a number was rejected (None for valid numbers).
+    """
+    raw = numbers.astype("string").str.strip()
+    # Excel turns 9876543210 into 9876543210.0
+    digits = raw.str.replace(r"\.0$", "", regex=True).str.replace(r"[\s\-().]", "", regex=True)
+    digits = digits.str.replace(r"^00", "+", regex=True)
+
+    international = digits.str.startswith("+")
+    national = digits.str.replace(r"^0+", "", regex=True)
+    with_code = national.str.len().eq(len(country_code) + national_length) & national.str.startswith(country_code)
+
+    normalized = digits.where(international, None)
+    normalized = normalized.mask(~international & national.str.len().eq(national_length), "+" + country_code + national)
+    normalized = normalized.mask(~international & with_code, "+" + national)
+
+    valid = normalized.str.match(E164_RE).fillna(False).astype(bool)
+    # Numbers in the default country must also have the right national length.
+    home = normalized.str.startswith("+" + country_code).fillna(False).astype(bool)
+    valid &= ~home | normalized.str.len().eq(1 + len(country_code) + national_length).fillna(False).astype(bool)
+
+    reason = pd.Series(None, index=numbers.index, dtype="object")
+    reason[~valid] = "invalid number"
+    reason[raw.isna() | raw.eq("") | raw.str.lower().isin(["nan", "none"])] = "missing number"
+    return normalized.where(valid, None).astype("object"), reason
+
+
+# Calls in these states no longer occupy the voice server.
+TERMINAL_CALL_STATUSES = {"completed", "busy", "failed", "no-answer", "canceled"}
+
+
+class LiveCallLimiter:
+    """
+    Caps simultaneous live calls. A slot is held from call creation until the
+    call reaches a terminal status, learned by polling Twilio (or earlier via
+    `release(sid)`), or until `max_duration` seconds have passed.
+    """
+    def __init__(self, client, max_live, poll_interval=5.0, max_duration=1800):
+        self.client = client
+        self.slots = threading.BoundedSemaphore(max_live)
+        self.poll_interval = poll_interval
+        self.max_duration = max_duration
+        self.live = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.poller = threading.Thread(target=self._poll, daemon=True)
+        self.poller.start()
+
+    def acquire(self):
+        self.slots.acquire()
+
+    def track(self, sid):
+        with self.lock:
+            self.live[sid] = time.monotonic()
+
+    def release(self, sid=None):
+        """Frees a slot: for a tracked call SID, or (sid=None) for a call that was never placed."""
+        if sid is not None:
+            with self.lock:
+                if self.live.pop(sid, None) is None:
+                    return
+        self.slots.release()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _poll(self):
+        while not self.stopped.wait(self.poll_interval):
+            with self.lock:
+                tracked = list(self.live.items())
+            for sid, started in tracked:
+                try:
+                    ended = self.client.calls(sid).fetch().status in TERMINAL_CALL_STATUSES
+                except Exception as e:
+                    print(f"Could not fetch status of call {sid}: {e}")
+                    ended = False
+                if ended or time.monotonic() - started > self.max_duration:
+                    self.release(sid)
+
+
 class VoiceCaller:
     def __init__(self):
         self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
@@ -12,6 +106,17 @@ class VoiceCaller:
         self.from_number = os.getenv("TWILIO_PHONE_NUMBER")
         
         self.data_dir = r"C:\Users\yashw\Desktop\AgenticHR\data"
+
+        # Outbound dialer: parallel REST requests, paced to Twilio's calls-per-second
+        # limit, with at most max_live calls connected to the voice server at once.
+        self.dial_concurrency = int(os.getenv("VOICE_DIALER_CONCURRENCY", "4"))
+        self.dial_cps = float(os.getenv("VOICE_DIALER_CPS", "1"))
+        self.max_live_calls = int(os.getenv("VOICE_DIALER_MAX_LIVE", "50"))
+        self.status_poll_interval = float(os.getenv("VOICE_DIALER_POLL_INTERVAL", "5"))
+        self.dial_limiter = None
+        self.live_calls = None
+        self.country_code = os.getenv("VOICE_DEFAULT_COUNTRY_CODE", "91").lstrip("+")
+        self.national_length = int(os.getenv("VOICE_NATIONAL_NUMBER_LENGTH", "10"))
         
         if not all([self.account_sid, self.auth_token, self.from_number]):
             print("WARNING: Twilio credentials not found in .env file.")
@@ -38,19 +143,50 @@ class VoiceCaller:
             print(f"Error loading file: {e}")
             return None
 
-    def make_call(self, to_number, candidate_name, role, salary_range, server_url):
-        """Initiates a voice call to the candidate connected to the AI Server."""
+    def prepare_dial_list(self, df):
+        """
+        Normalises the shortlist's mobile numbers to E.164, drops invalid ones
+        and dedupes numbers shared by several rows, before any call is placed.
+        Returns (dial_list, rejected); rejected has a `reject_reason` column.
+        """
+        df = df.copy()
+        df['e164'], df['reject_reason'] = normalize_phone_numbers(
+            df.get('mobile_number', pd.Series(None, index=df.index)), self.country_code, self.national_length
+        )
+        duplicate = df['e164'].notna() & df.duplicated('e164', keep='first')
+        if duplicate.any():
+            names = df['full_name'] if 'full_name' in df else df['e164']
+            first_name = names.groupby(df['e164']).transform('first')
+            df.loc[duplicate, 'reject_reason'] = "duplicate of " + first_name[duplicate].astype(str)
+
+        rejected = df[df['reject_reason'].notna()]
+        dial_list = df[df['reject_reason'].isna()].drop(columns=['reject_reason'])
+        if len(rejected):
+            print(f"Rejected {len(rejected)} of {len(df)} numbers before dialing:")
+            for _, row in rejected.iterrows():
+                print(f"  {row.get('full_name', 'Candidate')} ({row.get('mobile_number')}): {row['reject_reason']}")
+        return dial_list, rejected
+
+    def make_call(self, to_number, candidate_name, role, salary_range, server_url, attempt=1):
+        """
+        Initiates a voice call to the candidate connected to the AI Server.
+        Twilio posts the call's progress to {server_url}/call_status, which
+        records the outcome and queues redials (see call_tracker.py).
+        Returns {"candidate", "to", "sid", "error"}; sid is None if the call was not placed.
+        """
+        result = {"candidate": candidate_name, "to": str(to_number), "sid": None, "error": None}
         if not self.client:
             print(f"Skipping call to {candidate_name} (Twilio not configured)")
-            return
+            result["error"] = "Twilio not configured"
+            return result
 
-        # Sanitize phone number (basic)
-        to_number = str(to_number).strip()
-        if not to_number.startswith("+"):
-            if len(to_number) == 10:
-                to_number = "+91" + to_number
-            else:
-                 print(f"Warning: Phone number format might be incorrect for {candidate_name}: {to_number}")
+        normalized, reason = normalize_phone_numbers(pd.Series([to_number]), self.country_code, self.national_length)
+        if reason[0]:
+            print(f"Skipping call to {candidate_name}: {reason[0]} ({to_number})")
+            result["error"] = reason[0]
+            return result
+        to_number = normalized[0]
+        result["to"] = to_number
 
         from urllib.parse import urlencode, quote
         
@@ -61,17 +197,72 @@ class VoiceCaller:
         }
         encoded_params = urlencode(params)
         webhook_url = f"{server_url}/voice?{encoded_params}"
+        status_url = f"{server_url}/call_status?{urlencode({**params, 'attempt': attempt})}"
 
         try:
             call = self.client.calls.create(
                 url=webhook_url,
                 to=to_number,
                 from_=self.from_number,
-                method="POST"
+                method="POST",
+                status_callback=status_url,
+                status_callback_event=["initiated", "ringing", "answered", "completed"],
+                status_callback_method="POST"
             )
             print(f"Call initiated for {candidate_name} ({to_number}). Call SID: {call.sid}")
+            result["sid"] = call.sid
         except Exception as e:
             print(f"Failed to call {candidate_name}: {e}")
+            result["error"] = str(e)
+        return result
+
+    def start_dialer(self):
+        """Creates the calls-per-second pacer and live-call cap used by paced_call()."""
+        self.dial_limiter = RateLimiter(self.dial_cps)
+        if self.client:
+            self.live_calls = LiveCallLimiter(self.client, self.max_live_calls, self.status_poll_interval)
+
+    def paced_call(self, to_number, candidate_name, role, salary_range, server_url, attempt=1):
+        """make_call() after waiting for a live-call slot and the next calls-per-second tick."""
+        if self.live_calls is None:
+            return self.make_call(to_number, candidate_name, role, salary_range, server_url, attempt)
+        self.live_calls.acquire()
+        self.dial_limiter.acquire()
+        result = self.make_call(to_number, candidate_name, role, salary_range, server_url, attempt)
+        if result["sid"]:
+            self.live_calls.track(result["sid"])
+        else:
+            self.live_calls.release()
+        return result
+
+    def dial_candidates(self, df, role, salary_range, server_url):
+        """
+        Calls every candidate in `df` (full_name, mobile_number) with
+        VOICE_DIALER_CONCURRENCY parallel requests, paced to VOICE_DIALER_CPS
+        calls per second and at most VOICE_DIALER_MAX_LIVE live calls.
+        Numbers are cleaned by prepare_dial_list first. Returns one make_call()
+        result per dialled candidate, followed by one per rejected row.
+        """
+        dial_list, rejected = self.prepare_dial_list(df)
+        rejections = [
+            {"candidate": row.get('full_name', 'Candidate'), "to": str(row.get('mobile_number')), "sid": None, "error": row['reject_reason']}
+            for _, row in rejected.iterrows()
+        ]
+        candidates = [(row.get('full_name', 'Candidate'), row['e164']) for _, row in dial_list.iterrows()]
+        if not self.client:
+            return [self.make_call(mobile, name, role, salary_range, server_url) for name, mobile in candidates] + rejections
+
+        self.start_dialer()
+
+        def dial(candidate):
+            name, mobile = candidate
+            return self.paced_call(mobile, name, role, salary_range, server_url)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.dial_concurrency)) as pool:
+                return list(pool.map(dial, candidates)) + rejections
+        finally:
+            self.live_calls.stop()
 
     def process_candidates(self):
         print("\n--- Voice Caller Agent ---")
@@ -91,14 +282,12 @@ class VoiceCaller:
         default_role = input("Enter Role Name (e.g. Python Dev): ").strip()
         default_salary = input("Enter Offered Salary Range (e.g. 10-12 LPA): ").strip()
 
-        for index, row in df.iterrows():
-            name = row.get('full_name', 'Candidate')
-            mobile = row.get('mobile_number')
-            
-            print(f"Calling {name}...", end="\r")
-            self.make_call(mobile, name, default_role, default_salary, server_url)
-        
-        print("\nAll calls processed.")
+        results = self.dial_candidates(df, default_role, default_salary, server_url)
+        placed = [r for r in results if r["sid"]]
+        print(f"\nAll calls processed: {len(placed)} placed, {len(results) - len(placed)} failed.")
+        for r in results:
+            if r["error"]:
+                print(f"  {r['candidate']} ({r['to']}): {r['error']}")
 
 if __name__ == "__main__":
     agent = VoiceCaller()
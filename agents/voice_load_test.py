@@ -0,0 +1,278 @@
+"""
+Voice Server Webhook Load Test
+------------------------------
+Simulates N concurrent Twilio calls against a running voice_server.py over
+real HTTP: each call posts /voice, then one /process_speech per scripted
+candidate utterance, with Twilio's form fields and think time between
+turns. The LLM is mock_llm_server.py, so no Groq quota is used.
+
+Reports per-turn latency percentiles, error rates (HTTP errors, fallback
+TwiML, and turns slower than Twilio's 15 s webhook timeout) and the
+server's memory and active calls over time.
+
+Run (starts the mock LLM and a voice server subprocess itself):
+    python agents/voice_load_test.py --calls 10,50,100 --latency-ms 600
+
+Or against a server you started yourself (with GROQ_API_URL pointing at the mock LLM):
+    python agents/voice_load_test.py --url http://localhost:8000 --server-pid 12345
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+MOCK_PORT = 8099
+TWILIO_TIMEOUT = 15.0
+
+SCRIPT = [
+    "Yes, this is me speaking.",
+    "Thank you, I'm glad to hear that. Can you tell me more about the role?",
+    "Honestly I was expecting something closer to the top of the range.",
+    "Okay, if there are stock options I can consider the lower number.",
+    "I'm available next Monday at 10 AM for the technical interview.",
+    "Great, thanks. Bye.",
+]
+
+# TwiML the server sends when something went wrong on its side.
+FALLBACK_MARKERS = [
+    "trouble processing that",
+    "technical issue",
+    "encountered an error",
+    "lost the connection details",
+]
+
+
+def rss_bytes(pid):
+    """Resident memory of `pid` and its children (uvicorn workers), or None if unavailable."""
+    try:
+        import psutil
+        process = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    pids, total = [pid], 0
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                total += next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pids += [int(child) for child in f.read().split()]
+        except (OSError, StopIteration, ValueError):
+            if current == pid:
+                return None
+    return total
+
+
+class Results:
+    def __init__(self):
+        self.latencies = []
+        self.turns = 0
+        self.http_errors = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+        self.calls_completed = 0
+
+    def error_rate(self):
+        return (self.http_errors + self.timeouts + self.fallbacks) / self.turns if self.turns else 0.0
+
+
+async def post_turn(client, path, data, results):
+    """Posts one webhook like Twilio would and records its latency and outcome."""
+    results.turns += 1
+    started = time.perf_counter()
+    try:
+        response = await client.post(path, data=data, timeout=TWILIO_TIMEOUT)
+    except httpx.TimeoutException:
+        # Twilio gives up on the webhook after TWILIO_TIMEOUT and plays an application error.
+        results.timeouts += 1
+        return None
+    except httpx.HTTPError:
+        results.http_errors += 1
+        return None
+    results.latencies.append(time.perf_counter() - started)
+    if response.status_code != 200:
+        results.http_errors += 1
+        return None
+    if any(marker in response.text for marker in FALLBACK_MARKERS):
+        results.fallbacks += 1
+    return response.text
+
+
+async def simulate_call(client, call_sid, think_ms, results):
+    base = {
+        "CallSid": call_sid,
+        "AccountSid": "ACloadtest",
+        "From": "+15005550006",
+        "To": f"+1555{random.randint(1000000, 9999999)}",
+        "Direction": "outbound-api",
+    }
+    twiml = await post_turn(
+        client,
+        "/voice?candidate_name=Load%20Test&role=Python%20Developer&salary_range=10-12%20LPA",
+        {**base, "CallStatus": "in-progress"},
+        results
+    )
+    if twiml is None:
+        return
+
+    for utterance in SCRIPT:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * think_ms / 1000.0)
+        twiml = await post_turn(
+            client,
+            "/process_speech",
+            {**base, "CallStatus": "in-progress", "SpeechResult": utterance, "Confidence": "0.92"},
+            results
+        )
+        if twiml is None or "<Hangup" in twiml:
+            break
+    results.calls_completed += 1
+
+
+async def sample_server(client, pid, timeline, started, stop):
+    """Records server memory and active calls once a second."""
+    while not stop.is_set():
+        active = None
+        try:
+            active = (await client.get("/health", timeout=5)).json().get("active_calls")
+        except Exception:
+            pass
+        memory = rss_bytes(pid) if pid else None
+        timeline.append((time.perf_counter() - started, memory, active))
+        try:
+            await asyncio.wait_for(stop.wait(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_level(url, calls, ramp, think_ms, pid):
+    results = Results()
+    timeline = []
+    limits = httpx.Limits(max_connections=calls + 10, max_keepalive_connections=calls + 10)
+    async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+        stop = asyncio.Event()
+        started = time.perf_counter()
+        sampler = asyncio.create_task(sample_server(client, pid, timeline, started, stop))
+
+        async def staggered(i):
+            await asyncio.sleep(ramp * i / max(calls, 1))
+            await simulate_call(client, f"CALOAD{calls}x{i:05d}", think_ms, results)
+
+        await asyncio.gather(*(staggered(i) for i in range(calls)))
+        wall = time.perf_counter() - started
+        stop.set()
+        await sampler
+    return results, timeline, wall
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def print_level(calls, results, timeline, wall):
+    ordered = sorted(results.latencies) or [0.0]
+    p = {name: percentile(ordered, q) * 1000 for name, q in (("p50", 0.5), ("p90", 0.9), ("p95", 0.95), ("p99", 0.99))}
+    print(f"\n--- {calls} concurrent calls ({results.turns} webhooks in {wall:.1f}s) ---")
+    print(f"latency ms   p50 {p['p50']:.0f} | p90 {p['p90']:.0f} | p95 {p['p95']:.0f} | p99 {p['p99']:.0f} | max {ordered[-1] * 1000:.0f}")
+    print(f"errors       http {results.http_errors} | timeouts {results.timeouts} | fallback TwiML {results.fallbacks}"
+          f" | error rate {results.error_rate():.1%}")
+    print(f"calls        completed {results.calls_completed}/{calls} | throughput {results.turns / wall:.1f} webhooks/s")
+
+    print(f"{'t (s)':>7} {'RSS MB':>8} {'active':>7}")
+    rows = timeline[::max(1, len(timeline) // 10)]
+    if timeline and rows[-1] is not timeline[-1]:
+        rows.append(timeline[-1])
+    for at, memory, active in rows:
+        mb = f"{memory / 1024 / 1024:.1f}" if memory else "n/a"
+        print(f"{at:>7.1f} {mb:>8} {active if active is not None else 'n/a':>7}")
+
+    return p["p99"] / 1000 < TWILIO_TIMEOUT and results.error_rate() == 0
+
+
+def start_voice_server(port, workers, transcript_dir):
+    env = dict(os.environ)
+    env.update({
+        "GROQ_API_KEY": "mock",
+        "GROQ_API_URL": f"http://127.0.0.1:{MOCK_PORT}/v1",
+        "AUTO_SCHEDULE_ON_CALL_END": "false",
+        "VOICE_TRANSCRIPT_DIR": transcript_dir,
+        "VOICE_TTS_ENGINE": env.get("VOICE_TTS_ENGINE", "off"),
+        # Keep the run's call and state databases out of production's, and never redial
+        "VOICE_CALL_DB": os.path.join(transcript_dir, "call_status.db"),
+        "VOICE_STATE_DB": os.path.join(transcript_dir, "voice_state.db"),
+        "VOICE_RETRY_ENABLED": "false",
+    })
+    if workers > 1:
+        env.setdefault("VOICE_STATE_BACKEND", "sqlite")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "voice_server:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL
+    )
+    return process
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"Voice server at {url} did not come up")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent Twilio webhook load test for voice_server.py")
+    parser.add_argument("--calls", default="10,50,100", help="comma-separated concurrency levels")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which each level's calls start")
+    parser.add_argument("--think-ms", type=float, default=1000, help="mean caller think time between turns")
+    parser.add_argument("--latency-ms", type=float, default=600, help="mock LLM latency")
+    parser.add_argument("--url", help="existing voice server to test (skips starting one)")
+    parser.add_argument("--server-pid", type=int, help="pid of the existing server, for memory sampling")
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    import tempfile
+    import mock_llm_server
+    mock_llm_server.CONFIG["latency_ms"] = args.latency_ms
+    mock_llm_server.run_in_thread(MOCK_PORT)
+
+    server = None
+    url, pid = args.url, args.server_pid
+    if not url:
+        server = start_voice_server(args.port, args.workers, tempfile.mkdtemp(prefix="voice_load_"))
+        url, pid = f"http://127.0.0.1:{args.port}", server.pid
+
+    try:
+        wait_until_up(url)
+        print("=" * 60)
+        print(f"Voice server load test: {url} | mock LLM {args.latency_ms:.0f}ms | think {args.think_ms:.0f}ms")
+        print("=" * 60)
+        for calls in [int(x) for x in args.calls.split(",")]:
+            results, timeline, wall = asyncio.run(run_level(url, calls, args.ramp, args.think_ms, pid))
+            healthy = print_level(calls, results, timeline, wall)
+            if not healthy:
+                print(f"\n[!] {calls} calls: errors or p99 over Twilio's {TWILIO_TIMEOUT:.0f}s webhook timeout")
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
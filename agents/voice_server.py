@@ -1,13 +1,33 @@
 import os
+import re
 import json
+import asyncio
 import traceback
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
 from twilio.twiml.voice_response import VoiceResponse
-from openai import OpenAI
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 import datetime
 
+try:
+    from scheduler import SchedulerAgent
+    from transcript_writer import TranscriptWriter
+    from conversation_store import create_store
+    from history_manager import HistoryManager
+    from tts_cache import TTSCache
+    from speculative_reply import SpeculativeReplies
+    from call_tracker import CallTracker
+except ImportError:
+    from agents.scheduler import SchedulerAgent
+    from agents.transcript_writer import TranscriptWriter
+    from agents.conversation_store import create_store
+    from agents.history_manager import HistoryManager
+    from agents.tts_cache import TTSCache
+    from agents.speculative_reply import SpeculativeReplies
+    from agents.call_tracker import CallTracker
+
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env"))
 
 app = FastAPI()
@@ -19,11 +39,251 @@ MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
 print(f"[CONFIG] GROQ_API_KEY: {'SET' if GROQ_API_KEY else 'NOT SET'}")
 print(f"[CONFIG] Model: {MODEL}")
 
+VOICE_MODE = os.getenv("VOICE_MODE", "gather").lower()
+STREAM_URL = os.getenv("VOICE_STREAM_URL", "")
+LLM_TIMEOUT = float(os.getenv("VOICE_LLM_TIMEOUT", "8"))
+LLM_CONCURRENCY = int(os.getenv("VOICE_LLM_CONCURRENCY", "50"))
+TRANSCRIPT_DIR = os.getenv(
+    "VOICE_TRANSCRIPT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents", "transcripts")
+)
+
 CLIENT = None
 if GROQ_API_KEY:
-    CLIENT = OpenAI(api_key=GROQ_API_KEY, base_url=GROQ_API_URL)
-conversations = {}
-candidate_context = {}
+    CLIENT = AsyncOpenAI(api_key=GROQ_API_KEY, base_url=GROQ_API_URL, timeout=LLM_TIMEOUT, max_retries=1)
+llm_slots = asyncio.Semaphore(LLM_CONCURRENCY)
+transcripts = TranscriptWriter(lambda call_sid, context: transcript_path(call_sid, context))
+store = create_store()
+SWEEP_INTERVAL = float(os.getenv("VOICE_STATE_SWEEP_INTERVAL", "60"))
+
+tts = TTSCache(
+    os.getenv("VOICE_TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "tts_cache")),
+    engine=os.getenv("VOICE_TTS_ENGINE", "gtts").lower(),
+    lang=os.getenv("VOICE_TTS_LANG", "en"),
+    max_bytes=int(float(os.getenv("VOICE_TTS_CACHE_MB", "200")) * 1024 * 1024)
+)
+TTS_RENDER_WAIT = float(os.getenv("VOICE_TTS_RENDER_WAIT", "1.5"))
+app.mount("/tts", StaticFiles(directory=tts.directory), name="tts")
+
+FALLBACK_REPLY = "I'm having trouble processing that. Could you repeat?"
+FIXED_PROMPTS = [
+    FALLBACK_REPLY,
+    "Sorry, there was a technical issue. Please try again later.",
+    "I'm sorry, I lost the connection details. Goodbye.",
+    "I encountered an error. Goodbye.",
+]
+
+call_tracker = CallTracker(
+    os.getenv("VOICE_CALL_DB", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "call_status.db")),
+    max_attempts=int(os.getenv("VOICE_RETRY_MAX_ATTEMPTS", "3")),
+    base_delay=float(os.getenv("VOICE_RETRY_BASE_DELAY", "600")),
+    max_delay=float(os.getenv("VOICE_RETRY_MAX_DELAY", "7200")),
+    window=os.getenv("VOICE_RETRY_WINDOW", "09:00-19:00"),
+    claim_timeout=float(os.getenv("VOICE_RETRY_CLAIM_TIMEOUT", "300"))
+)
+RETRY_ENABLED = os.getenv("VOICE_RETRY_ENABLED", "true").lower() == "true"
+RETRY_POLL_INTERVAL = float(os.getenv("VOICE_RETRY_POLL_INTERVAL", "30"))
+PUBLIC_URL = os.getenv("VOICE_PUBLIC_URL", "").rstrip("/")
+
+AUTO_SCHEDULE = os.getenv("AUTO_SCHEDULE_ON_CALL_END", "true").lower() == "true"
+call_events = None
+call_completed_hooks = []
+
+
+def on_call_completed(hook):
+    """Registers an in-process hook called with each call-completed event."""
+    call_completed_hooks.append(hook)
+    return hook
+
+
+async def generate_reply(messages):
+    """Awaits the LLM without blocking the event loop; at most LLM_CONCURRENCY calls in flight."""
+    async with llm_slots:
+        completion = await CLIENT.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=150
+        )
+    return completion.choices[0].message.content
+
+
+async def summarize_turns(messages):
+    """LLM call used by the history manager to fold old turns into the running summary."""
+    async with llm_slots:
+        completion = await CLIENT.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            temperature=0.2,
+            max_tokens=200
+        )
+    return completion.choices[0].message.content
+
+
+history_manager = HistoryManager(
+    store,
+    summarize_turns,
+    keep=int(os.getenv("VOICE_HISTORY_KEEP_MESSAGES", "8")),
+    batch=int(os.getenv("VOICE_HISTORY_COMPACT_EVERY", "6"))
+)
+
+
+SPECULATIVE = os.getenv("VOICE_SPECULATIVE", "false").lower() == "true"
+speculative = SpeculativeReplies(
+    lambda messages: generate_reply(messages),
+    min_words=int(os.getenv("VOICE_SPECULATIVE_MIN_WORDS", "3")),
+    match=float(os.getenv("VOICE_SPECULATIVE_MATCH", "0.9")),
+    max_drafts=int(os.getenv("VOICE_SPECULATIVE_MAX_DRAFTS", "3")),
+    max_tail=int(os.getenv("VOICE_SPECULATIVE_MAX_TAIL", "3"))
+)
+
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(buffer):
+    """Splits complete sentences off a streamed buffer. Returns (sentences, remainder)."""
+    parts = SENTENCE_END_RE.split(buffer)
+    return [p.strip() for p in parts[:-1] if p.strip()], parts[-1]
+
+
+async def stream_reply(messages):
+    """Yields the LLM reply sentence by sentence while it is still being generated."""
+    async with llm_slots:
+        stream = await CLIENT.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=150,
+            stream=True
+        )
+        buffer = ""
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            buffer += chunk.choices[0].delta.content or ""
+            sentences, buffer = split_sentences(buffer)
+            for sentence in sentences:
+                yield sentence
+        if buffer.strip():
+            yield buffer.strip()
+
+
+async def speak(response, text, render=True):
+    """Adds cached audio for `text` with <Play>, or falls back to live <Say>."""
+    url = await tts.url_for(text, wait=TTS_RENDER_WAIT) if render else tts.cached_url(text)
+    if url:
+        response.play(url)
+    else:
+        response.say(text, voice="alice")
+
+
+def gather(response):
+    """Listens for the caller's next turn; in speculative mode partial results are posted too."""
+    if SPECULATIVE and CLIENT:
+        response.gather(
+            input="speech", action="/process_speech", speechTimeout="auto", timeout=10,
+            partial_result_callback="/partial_speech", partial_result_callback_method="POST"
+        )
+    else:
+        response.gather(input="speech", action="/process_speech", speechTimeout="auto", timeout=10)
+
+
+def is_goodbye(text):
+    lowered = text.lower()
+    return "goodbye" in lowered or "have a great day" in lowered
+
+
+def emit_call_completed(call_sid, state):
+    """Publishes a call-completed event to hooks and the scheduler queue."""
+    context = state.get("context", {})
+    event = {
+        "call_sid": call_sid,
+        "candidate": context.get("name", "Unknown"),
+        "transcript": transcript_path(call_sid, context),
+        "ended_at": datetime.datetime.now().isoformat()
+    }
+    print(f"[EVENT] Call completed: {call_sid}")
+
+    for hook in call_completed_hooks:
+        try:
+            hook(event)
+        except Exception as e:
+            print(f"[ERROR] Call-completed hook: {e}")
+
+    if call_events is not None:
+        call_events.put_nowait(event)
+
+
+async def scheduler_worker():
+    """Extracts the interview slot as soon as a call ends and updates the schedule."""
+    agent = None
+    while True:
+        event = await call_events.get()
+        try:
+            if agent is None:
+                agent = await asyncio.to_thread(SchedulerAgent)
+            row = await asyncio.to_thread(agent.process_transcript_file, event["transcript"])
+            if row:
+                await asyncio.to_thread(agent.upsert_schedule, row)
+            else:
+                print(f"[SCHEDULER] No slot agreed on call {event['call_sid']}")
+        except Exception as e:
+            print(f"[ERROR] Scheduling call {event['call_sid']}: {e}")
+        finally:
+            call_events.task_done()
+
+
+async def state_sweeper():
+    """Evicts expired call state and closes transcripts of calls that went quiet."""
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        try:
+            evicted = await store.evict_expired()
+            if evicted:
+                print(f"[STATE] Evicted {len(evicted)} expired call(s)")
+            transcripts.close_idle(store.ttl)
+            speculative.discard_stale(SWEEP_INTERVAL)
+        except Exception as e:
+            print(f"[ERROR] State sweep: {e}")
+
+
+async def retry_worker():
+    """Redials candidates whose calls went unanswered, once their backoff is due."""
+    try:
+        from voice_caller import VoiceCaller
+    except ImportError:
+        from agents.voice_caller import VoiceCaller
+    caller = await asyncio.to_thread(VoiceCaller)
+    # Redials obey the same VOICE_DIALER_CPS pacing and VOICE_DIALER_MAX_LIVE cap as bulk dialling.
+    caller.start_dialer()
+    while True:
+        await asyncio.sleep(RETRY_POLL_INTERVAL)
+        try:
+            for retry in await asyncio.to_thread(call_tracker.claim_due):
+                print(f"[RETRY] Redialling {retry['candidate']} (attempt {retry['attempt']})")
+                result = await asyncio.to_thread(
+                    caller.paced_call, retry["to_number"], retry["candidate"], retry["role"],
+                    retry["salary_range"], retry["server_url"], retry["attempt"]
+                )
+                await asyncio.to_thread(call_tracker.dialed, retry["to_number"], result["error"])
+        except Exception as e:
+            print(f"[ERROR] Retry worker: {e}")
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    global call_events
+    transcripts.start()
+    asyncio.create_task(state_sweeper())
+    if tts.enabled:
+        asyncio.create_task(tts.warm(FIXED_PROMPTS))
+    if RETRY_ENABLED:
+        asyncio.create_task(retry_worker())
+    if AUTO_SCHEDULE:
+        call_events = asyncio.Queue()
+        asyncio.create_task(scheduler_worker())
+        print("[CONFIG] Auto-scheduling on call end: enabled")
 
 
 @app.post("/voice")
@@ -46,7 +306,7 @@ async def voice_start(request: Request):
         print(f"[CALL START] CallSid: {CallSid}")
         print(f"[CALL START] Candidate: {candidate_name}, Role: {role}, Salary: {salary_range}")
         
-        candidate_context[CallSid] = {
+        context = {
             "name": candidate_name,
             "role": role,
             "salary_range": salary_range
@@ -64,23 +324,36 @@ Keep your responses concise (1-2 sentences) as this is a voice conversation. Spe
         
         greeting = f"Hello {candidate_name}, this is a call from Agentic HR. Am I speaking with {candidate_name}?"
         
-        conversations[CallSid] = [
-            {"role": "system", "content": system_prompt},
-            {"role": "assistant", "content": greeting}
-        ]
+        await store.save(CallSid, {
+            "history": [
+                {"role": "system", "content": system_prompt},
+                {"role": "assistant", "content": greeting}
+            ],
+            "context": context
+        })
 
         response = VoiceResponse()
-        response.say(greeting, voice="alice")
-        response.gather(input="speech", action="/process_speech", speechTimeout="auto", timeout=10)
+        if VOICE_MODE == "stream":
+            relay_url = STREAM_URL or f"wss://{request.headers.get('host')}/conversation-relay"
+            connect = response.connect()
+            connect.conversation_relay(
+                url=relay_url,
+                welcome_greeting=greeting,
+                partial_prompts=True,
+                interruptible="any"
+            )
+        else:
+            await speak(response, greeting)
+            gather(response)
         
-        print(f"[RESPONSE] Sending TwiML greeting")
+        print(f"[RESPONSE] Sending TwiML greeting ({VOICE_MODE} mode)")
         return Response(content=str(response), media_type="application/xml")
         
     except Exception as e:
         print(f"[ERROR in /voice] {e}")
         traceback.print_exc()
         response = VoiceResponse()
-        response.say("Sorry, there was a technical issue. Please try again later.")
+        await speak(response, "Sorry, there was a technical issue. Please try again later.")
         response.hangup()
         return Response(content=str(response), media_type="application/xml")
 
@@ -96,28 +369,27 @@ async def process_speech(request: Request):
         print(f"[SPEECH] CallSid: {CallSid}")
         print(f"[SPEECH] User said: {SpeechResult}")
         
-        if CallSid not in conversations:
+        state = await store.load(CallSid)
+        if state is None:
             print(f"[ERROR] CallSid {CallSid} not in conversations!")
             response = VoiceResponse()
-            response.say("I'm sorry, I lost the connection details. Goodbye.")
+            await speak(response, "I'm sorry, I lost the connection details. Goodbye.")
             response.hangup()
             return Response(content=str(response), media_type="application/xml")
         
         if SpeechResult:
-            conversations[CallSid].append({"role": "user", "content": SpeechResult})
+            state["history"].append({"role": "user", "content": SpeechResult})
         
-        ai_text = "I'm having trouble processing that. Could you repeat?"
+        ai_text = FALLBACK_REPLY
         
         if CLIENT:
             try:
-                completion = CLIENT.chat.completions.create(
-                    model=MODEL,
-                    messages=conversations[CallSid],
-                    temperature=0.7,
-                    max_tokens=150
-                )
-                ai_text = completion.choices[0].message.content
-                conversations[CallSid].append({"role": "assistant", "content": ai_text})
+                draft = None
+                if SPECULATIVE:
+                    draft = await speculative.take(CallSid, len(state["history"]) - 1, SpeechResult)
+                    print(f"[SPECULATIVE] Draft {'reused' if draft else 'not usable'} on {CallSid}")
+                ai_text = draft or await generate_reply(history_manager.prompt(state))
+                state["history"].append({"role": "assistant", "content": ai_text})
                 print(f"[AI] Response: {ai_text}")
                 
             except Exception as e:
@@ -125,15 +397,20 @@ async def process_speech(request: Request):
         else:
             print("[ERROR] CLIENT not initialized - check GROQ_API_KEY")
         
-        save_transcript(CallSid)
+        save_transcript(CallSid, state)
+        await store.save(CallSid, state)
+        if CLIENT:
+            history_manager.schedule_refresh(CallSid, state)
         
         response = VoiceResponse()
-        response.say(ai_text, voice="alice")
+        # Only fixed lines are cached; live LLM replies are too varied to be worth rendering.
+        await speak(response, ai_text, render=False)
         
-        if "goodbye" in ai_text.lower() or "have a great day" in ai_text.lower():
+        if is_goodbye(ai_text):
             response.hangup()
+            await end_call(CallSid, state)
         else:
-            response.gather(input="speech", action="/process_speech", speechTimeout="auto", timeout=10)
+            gather(response)
         
         return Response(content=str(response), media_type="application/xml")
         
@@ -141,49 +418,210 @@ async def process_speech(request: Request):
         print(f"[ERROR in /process_speech] {e}")
         traceback.print_exc()
         response = VoiceResponse()
-        response.say("I encountered an error. Goodbye.")
+        await speak(response, "I encountered an error. Goodbye.")
         response.hangup()
         return Response(content=str(response), media_type="application/xml")
 
 
-def save_transcript(call_sid):
-    """Saves the conversation to a file."""
-    if call_sid not in conversations:
+@app.post("/call_status")
+async def call_status(request: Request):
+    """Twilio statusCallback: records each call's progress and queues redials for unanswered calls."""
+    form_data = await request.form()
+    query = request.query_params
+    status = form_data.get("CallStatus", "")
+    call_sid = form_data.get("CallSid", "")
+    candidate = query.get("candidate_name", "Candidate")
+    print(f"[CALL STATUS] {call_sid}: {status} ({candidate})")
+
+    action = await asyncio.to_thread(
+        call_tracker.record,
+        call_sid,
+        status,
+        candidate,
+        form_data.get("To", ""),
+        query.get("role", ""),
+        query.get("salary_range", ""),
+        PUBLIC_URL or f"https://{request.headers.get('host')}",
+        int(query.get("attempt", "1")),
+        int(form_data.get("CallDuration") or 0) or None
+    )
+    if action == "retry":
+        print(f"[RETRY] Queued redial for {candidate} after {status}")
+
+    if status == "completed":
+        # The caller hung up before the goodbye: still close the transcript and schedule.
+        state = await store.load(call_sid)
+        if state is not None and not state.get("completed"):
+            print(f"[CALL END] {call_sid} ended by the caller")
+            save_transcript(call_sid, state)
+            await end_call(call_sid, state)
+    return Response(status_code=204)
+
+
+@app.get("/call_status")
+async def call_status_summary():
+    """Campaign coverage: latest status per candidate and the retry queue."""
+    return await asyncio.to_thread(call_tracker.summary)
+
+
+@app.post("/partial_speech")
+async def partial_speech(request: Request):
+    """Gather partialResultCallback: drafts a reply from the stable part of what the caller is saying."""
+    form_data = await request.form()
+    call_sid = form_data.get("CallSid", "")
+    stable = form_data.get("StableSpeechResult", "")
+    if SPECULATIVE and CLIENT and stable:
+        state = await store.load(call_sid)
+        if state is not None and not state.get("completed"):
+            speculative.observe(call_sid, len(state["history"]), history_manager.prompt(state), stable)
+    return Response(status_code=204)
+
+
+async def reply_sentences(call_sid, state, turn, text):
+    """The reply sentence by sentence: a matching speculative draft if there is one, else streamed from the LLM."""
+    draft = await speculative.take(call_sid, turn, text) if SPECULATIVE else None
+    if draft:
+        print(f"[SPECULATIVE] Draft reused on {call_sid}")
+        sentences, rest = split_sentences(draft)
+        for sentence in sentences + ([rest.strip()] if rest.strip() else []):
+            yield sentence
         return
-    
-    history = conversations[call_sid]
-    context = candidate_context.get(call_sid, {})
-    name = context.get('name', 'Unknown')
-    
-    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    transcript_dir = os.path.join(root_dir, "agents", "transcripts")
-    
-    os.makedirs(transcript_dir, exist_ok=True)
-    
-    filename = f"{name.replace(' ', '_')}_{call_sid}.txt"
-    filepath = os.path.join(transcript_dir, filename)
-    
+    async for sentence in stream_reply(history_manager.prompt(state)):
+        yield sentence
+
+
+async def relay_reply(websocket, call_sid, state, turn, text):
+    """Streams the reply to ConversationRelay one sentence at a time as it is generated."""
+    sent = []
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"Candidate: {name}\n")
-            f.write(f"Role: {context.get('role')}\n")
-            f.write(f"Salary Range: {context.get('salary_range')}\n")
-            f.write(f"Date: {datetime.datetime.now()}\n")
-            f.write("-" * 20 + "\n\n")
-            
-            for msg in history:
-                if msg['role'] != 'system':
-                    f.write(f"{msg['role'].upper()}: {msg['content']}\n")
-        
-        print(f"[TRANSCRIPT] Saved: {filepath}")
+        if not CLIENT:
+            raise RuntimeError("CLIENT not initialized - check GROQ_API_KEY")
+        async for sentence in reply_sentences(call_sid, state, turn, text):
+            sent.append(sentence)
+            await websocket.send_text(json.dumps({"type": "text", "token": sentence + " ", "last": False}))
+        await websocket.send_text(json.dumps({"type": "text", "token": "", "last": True}))
+    except asyncio.CancelledError:
+        print(f"[BARGE-IN] Reply cancelled on {call_sid}")
+        raise
     except Exception as e:
-        print(f"[ERROR] Saving transcript: {e}")
+        print(f"[LLM Error] {e}")
+        await websocket.send_text(json.dumps({"type": "text", "token": FALLBACK_REPLY, "last": True}))
+        return
+    finally:
+        if sent:
+            ai_text = " ".join(sent)
+            state["history"].append({"role": "assistant", "content": ai_text})
+            print(f"[AI] Response: {ai_text}")
+            save_transcript(call_sid, state)
+            await store.save(call_sid, state)
+            history_manager.schedule_refresh(call_sid, state)
+
+    if is_goodbye(" ".join(sent)):
+        await websocket.send_text(json.dumps({"type": "end"}))
+
+
+@app.websocket("/conversation-relay")
+async def conversation_relay(websocket: WebSocket):
+    """
+    Bidirectional streaming mode (VOICE_MODE=stream). Twilio ConversationRelay
+    streams partial and final speech transcripts in; replies stream back
+    sentence by sentence while the LLM is still generating, and the caller
+    can barge in at any point.
+    """
+    await websocket.accept()
+    call_sid = None
+    state = None
+    reply_task = None
+
+    try:
+        while True:
+            message = json.loads(await websocket.receive_text())
+            kind = message.get("type")
+
+            if kind == "setup":
+                call_sid = message.get("callSid")
+                print(f"[STREAM] Connected: {call_sid}")
+                state = await store.load(call_sid)
+                if state is None:
+                    print(f"[ERROR] CallSid {call_sid} not in conversations!")
+                    await websocket.send_text(json.dumps({"type": "end"}))
+                    break
+
+            elif kind == "prompt":
+                text = message.get("voicePrompt", "")
+                if state is None:
+                    print(f"[STREAM] Prompt before setup on {call_sid}; ignored")
+                    continue
+                if not message.get("last", True):
+                    print(f"\r[PARTIAL] {text[-60:]}", end="", flush=True)
+                    if SPECULATIVE and CLIENT:
+                        # Start drafting the reply while the caller is still talking.
+                        speculative.observe(call_sid, len(state["history"]), history_manager.prompt(state), text)
+                    continue
+                print(f"\n[SPEECH] User said: {text}")
+                if reply_task and not reply_task.done():
+                    reply_task.cancel()
+                turn = len(state["history"])
+                state["history"].append({"role": "user", "content": text})
+                reply_task = asyncio.create_task(relay_reply(websocket, call_sid, state, turn, text))
+
+            elif kind == "interrupt":
+                if reply_task and not reply_task.done():
+                    reply_task.cancel()
+                    try:
+                        await reply_task
+                    except asyncio.CancelledError:
+                        pass
+                # Keep only what the caller actually heard in the history.
+                heard = message.get("utteranceUntilInterrupt", "")
+                history = state["history"] if state else []
+                if history and history[-1]["role"] == "assistant":
+                    if heard:
+                        history[-1]["content"] = heard
+                    else:
+                        history.pop()
+                    await store.save(call_sid, state)
+
+            elif kind == "error":
+                print(f"[STREAM ERROR] {message.get('description')}")
+
+    except WebSocketDisconnect:
+        print(f"[STREAM] Disconnected: {call_sid}")
+    finally:
+        if reply_task and not reply_task.done():
+            reply_task.cancel()
+        if state is not None:
+            save_transcript(call_sid, state)
+            # Shielded so the call is still closed out if the socket task is cancelled.
+            await asyncio.shield(end_call(call_sid, state))
+
+
+def transcript_path(call_sid, context):
+    """Returns the transcript file path for a call."""
+    name = context.get('name', 'Unknown')
+    return os.path.join(TRANSCRIPT_DIR, f"{name.replace(' ', '_')}_{call_sid}.txt")
+
+
+def save_transcript(call_sid, state):
+    """Queues the new turns of the conversation for appending to its transcript file."""
+    transcripts.save(call_sid, state)
+
+
+async def end_call(call_sid, state):
+    """Marks the call ended, fsyncs its transcript, then publishes the call-completed event once."""
+    if state.get("completed"):
+        return
+    state["completed"] = True
+    speculative.discard(call_sid)
+    await store.save(call_sid, state)
+    await store.end(call_sid)
+    transcripts.close(state, on_closed=lambda: emit_call_completed(call_sid, state))
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "ok", "groq_configured": GROQ_API_KEY is not None}
+    return {"status": "ok", "groq_configured": GROQ_API_KEY is not None, "active_calls": await store.count()}
 
 
 if __name__ == "__main__":
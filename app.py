@@ -62,20 +62,22 @@ def run_voice_caller(job_id, server_url, role, salary_range):
     
     caller = VoiceCaller()
     if not caller.client:
-        return {"error": "Twilio not configured", "calls_made": 0}
+        return {"success": False, "error": "Twilio not configured", "calls_made": 0}
     
     df = caller.load_shortlisted_candidates(job_id)
     if df is None:
-        return {"error": f"No shortlisted file for {job_id}", "calls_made": 0}
+        return {"success": False, "error": f"No shortlisted file for {job_id}", "calls_made": 0}
     
-    calls_made = 0
-    for _, row in df.iterrows():
-        name = row.get('full_name', 'Candidate')
-        mobile = row.get('mobile_number')
-        caller.make_call(mobile, name, role, salary_range, server_url)
-        calls_made += 1
+    calls = caller.dial_candidates(df, role, salary_range, server_url)
+    calls_made = sum(1 for c in calls if c["sid"])
     
-    return {"calls_made": calls_made}
+    return {
+        "success": calls_made > 0 or not calls,
+        "calls_made": calls_made,
+        "calls_failed": len(calls) - calls_made,
+        "calls": calls,
+        "error": None if calls_made or not calls else "All calls failed"
+    }
 
 
 def run_scheduler():
@@ -320,6 +322,9 @@ def main():
                     
                     if result['success']:
                         st.success(f"✅ Made {result['calls_made']} calls")
+                        for call in result.get('calls', []):
+                            if call['error']:
+                                st.warning(f"{call['candidate']} ({call['to']}): {call['error']}")
                         st.session_state.current_step = 2
                         st.rerun()
                     else:
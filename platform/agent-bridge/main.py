@@ -154,15 +154,16 @@ async def run_voice_caller_task(task_id: str, request: VoiceCallerRequest):
             update_task(task_id, "failed", error=f"No shortlisted candidates for job {request.job_id}")
             return
         
-        calls_made = 0
-        for _, row in df.iterrows():
-            name = row.get('full_name', 'Candidate')
-            mobile = row.get('mobile_number')
-            caller.make_call(mobile, name, request.role, request.salary_range, request.server_url)
-            calls_made += 1
+        # Blocking Twilio requests run on a thread so the bridge stays responsive.
+        calls = await asyncio.to_thread(
+            caller.dial_candidates, df, request.role, request.salary_range, request.server_url
+        )
+        calls_made = sum(1 for c in calls if c["sid"])
         
         update_task(task_id, "completed", result={
             "calls_initiated": calls_made,
+            "calls_failed": len(calls) - calls_made,
+            "calls": calls,
             "job_id": request.job_id
         })
         